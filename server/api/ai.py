@@ -1,20 +1,166 @@
 # summsync/api/ai.py
-import os, json, logging
-import boto3
-from botocore.config import Config
-from botocore.exceptions import BotoCoreError, ClientError
-from typing import Any, Dict
+import os, json, time, logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from store.session import query_session
-from api.shared import ok, bad, parse_body, short_error
+from core.context import build_context
+from core import trace
+from store.ai_cache import insight_key, get_cached_insight, put_cached_insight
+from api.shared import ok, bad, cors, parse_body, short_error
 
 logger = logging.getLogger(__name__)
 BEDROCK_REGION = os.getenv("BEDROCK_REGION", "us-west-2")
 MODEL_ID       = os.environ.get("MODEL_ID")
-br = boto3.client(
-    "bedrock-runtime",
-    region_name=BEDROCK_REGION,
-    config=Config(retries={"max_attempts": 3, "mode": "standard"}, read_timeout=30, connect_timeout=5), # Will attempt 5 times w/ 30 seconds timeouts
-)
+AI_CONTEXT_TOKENS = int(os.environ.get("AI_CONTEXT_TOKENS", "1500")) # Input token budget for the session context
+AI_BATCH_WORKERS  = int(os.environ.get("AI_BATCH_WORKERS", "6"))     # Concurrent Bedrock calls per batch request
+AI_BATCH_MAX      = 10 # Prompts per batch request (5 solo + group fits comfortably)
+BASELINE_PATH     = os.environ.get("BASELINE_PATH") # Tier/lane baseline (core/baseline.py), adds percentiles to the context
+_br = None
+
+def _bedrock(): # Built on first model call, so cached answers and every other route never pay for it
+    global _br
+    if _br is None:
+        import boto3
+        from botocore.config import Config
+        _br = boto3.client(
+            "bedrock-runtime",
+            region_name=BEDROCK_REGION,
+            config=Config(retries={"max_attempts": 3, "mode": "standard"}, read_timeout=30, connect_timeout=5), # Will attempt 5 times w/ 30 seconds timeouts
+        )
+    return _br
+
+INFERENCE_CONFIG = {"maxTokens": 3000, "temperature": 0.3, "topP": 0.9}
+
+def _with_percentiles(players_ctx):
+    # Only imported when a baseline is deployed, numpy stays off the cold start otherwise
+    if not BASELINE_PATH:
+        return players_ctx
+    from core.baseline import stat_percentiles, np
+    if np is None:
+        return players_ctx
+    out = []
+    for p in players_ctx:
+        stats = p.get("stats") or {}
+        pct = stat_percentiles(stats, (stats.get("rankedSolo") or {}).get("tier"), stats.get("mostPlayedLane"))
+        out.append(dict(p, percentiles=pct) if pct else p)
+    return out
+
+def _system_messages(players_ctx):
+    system_msgs = [{"text": "Be concise and precise"}]
+    if players_ctx:
+        players_ctx = _with_percentiles(players_ctx)
+        ctx, level = build_context(players_ctx, AI_CONTEXT_TOKENS) # Compact table, trimmed evenly to the token budget
+        if level:
+            logger.info("AI context trimmed to layout %d for %d players", level, len(players_ctx))
+        system_msgs.append({"text": f"Player context (pipe-separated table):\n{ctx}"})
+    return system_msgs
+
+def _record_usage(usage: Dict[str, Any]): # Bedrock token usage of one call, summed on the request trace
+    trace.incr("bedrock.calls")
+    trace.incr("bedrock.inputTokens", usage.get("inputTokens") or 0)
+    trace.incr("bedrock.outputTokens", usage.get("outputTokens") or 0)
+
+def _is_aws_error(e: Exception) -> bool:
+    # botocore ClientError / BotoCoreError, matched by module so botocore is not imported up front
+    return type(e).__module__.startswith("botocore.")
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def stream_insight(system_msgs, prompt: str, cache_key: Optional[str] = None, read_cache: bool = True) -> Iterator[str]:
+    '''
+        stream_insight -> Calls converse_stream and yields Server-Sent Events as the model writes
+        "delta" events carry partial text, "done" carries timing (timeToFirstTokenMs) + token usage, "error" ends a failed stream
+        cache_key: str -> When set, a finished answer is cached, and a cached one is replayed as one delta (unless read_cache is False)
+    '''
+    started = time.monotonic()
+    if cache_key and read_cache:
+        hit = get_cached_insight(cache_key)
+        if hit is not None:
+            trace.incr("cache.insight.hit")
+            yield _sse("delta", {"text": hit["answer"]})
+            yield _sse("done", {"modelId": MODEL_ID, "cached": True, "timeToFirstTokenMs": 0,
+                                "totalMs": int((time.monotonic() - started) * 1000)})
+            return
+    trace.incr("cache.insight.miss")
+
+    first_token_ms = None
+    parts = []
+    try:
+        resp = _bedrock().converse_stream(
+            modelId=MODEL_ID,
+            system=system_msgs,
+            messages=[{"role": "user", "content": [{"text": prompt}]}],
+            inferenceConfig=INFERENCE_CONFIG,
+        )
+        usage, stop_reason = {}, None
+        for ev in resp.get("stream") or []:
+            if "contentBlockDelta" in ev:
+                text = (ev["contentBlockDelta"].get("delta") or {}).get("text")
+                if text:
+                    if first_token_ms is None:
+                        first_token_ms = int((time.monotonic() - started) * 1000)
+                        trace.record("bedrock.timeToFirstToken", first_token_ms)
+                        t = trace.current()
+                        if t is not None:
+                            t.attrs["timeToFirstTokenMs"] = first_token_ms # Top-level field of the request summary
+                    parts.append(text)
+                    yield _sse("delta", {"text": text})
+            elif "messageStop" in ev:
+                stop_reason = ev["messageStop"].get("stopReason")
+            elif "metadata" in ev:
+                usage = ev["metadata"].get("usage") or {}
+
+        trace.record("bedrock.converseStream", (time.monotonic() - started) * 1000)
+        _record_usage(usage)
+        if cache_key:
+            put_cached_insight(cache_key, {"answer": "".join(parts).strip()})
+        yield _sse("done", {
+            "modelId": MODEL_ID, "cached": False, "stopReason": stop_reason, "usage": usage,
+            "timeToFirstTokenMs": first_token_ms, "totalMs": int((time.monotonic() - started) * 1000),
+        })
+    except Exception as e:
+        if _is_aws_error(e):
+            logger.exception("Bedrock stream error")
+            yield _sse("error", {"error": f"Bedrock error: {short_error(e)}"})
+        else:
+            logger.exception("Unexpected stream error")
+            yield _sse("error", {"error": f"Internal error: {type(e).__name__}"})
+
+def generate_insight(system_msgs, prompt: str, force_refresh: bool = False) -> Tuple[str, bool]:
+    '''
+        generate_insight -> Answer for one prompt, from the insight cache or a Bedrock converse call
+        Returns (answer, cached), Bedrock errors are raised to the caller
+    '''
+    # Same model + context + prompt + config => same answer, so reloads and re-shares skip Bedrock
+    cache_key = insight_key(MODEL_ID, system_msgs, prompt, INFERENCE_CONFIG)
+    if not force_refresh:
+        hit = get_cached_insight(cache_key)
+        if hit is not None:
+            trace.incr("cache.insight.hit")
+            return hit["answer"], True
+    trace.incr("cache.insight.miss")
+
+    # Actual Model Call
+    with trace.span("bedrock.converse"):
+        resp = _bedrock().converse(
+            modelId=MODEL_ID,
+            system=system_msgs,
+            messages=[{"role": "user", "content": [{"text": prompt}]}],
+            inferenceConfig=INFERENCE_CONFIG,
+        )
+    usage = resp.get("usage") or {}
+    _record_usage(usage)
+    latency_ms = (resp.get("metrics") or {}).get("latencyMs")
+    if latency_ms is not None: # Model-side latency; with a buffered response this is what the user waits on
+        trace.record("bedrock.modelLatency", latency_ms)
+        logger.info("Bedrock converse latency: %d ms for %s output tokens", latency_ms, usage.get("outputTokens"))
+    out_msg = (resp.get("output") or {}).get("message") or {}
+    pieces = out_msg.get("content") or []
+    text_parts = [p["text"] for p in pieces if isinstance(p, dict) and "text" in p]
+    answer = "\n".join(text_parts).strip()
+    put_cached_insight(cache_key, {"answer": answer})
+    return answer, False
 
 def ep_ai_insight(event: Dict[str, Any]): # This endpoint will call the bedrock deepseek model to prompt with coaching message, then return insights
     if not MODEL_ID:
@@ -27,28 +173,83 @@ def ep_ai_insight(event: Dict[str, Any]): # This endpoint will call the bedrock
 
     session_id = body.get("sessionId")
     players_ctx = query_session(session_id) if session_id else [] # Will query this session
+    system_msgs = _system_messages(players_ctx)
 
-    system_msgs = [{"text": "Be concise and precise"}]
-    if players_ctx:
-        ctx = json.dumps({"players": players_ctx})[:15000]
-        system_msgs.append({"text": f"Context JSON:\n{ctx}"})
+    force_refresh = bool(body.get("forceRefresh", False)) # Optional, skips the insight cache but still refreshes it
 
-    # Actual Model Call
     try:
-        resp = br.converse(
-            modelId=MODEL_ID,
-            system=system_msgs,
-            messages=[{"role": "user", "content": [{"text": prompt}]}],
-            inferenceConfig={"maxTokens": 3000, "temperature": 0.3, "topP": 0.9},
-        )
-        out_msg = (resp.get("output") or {}).get("message") or {}
-        pieces = out_msg.get("content") or []
-        text_parts = [p["text"] for p in pieces if isinstance(p, dict) and "text" in p]
-        answer = "\n".join(text_parts).strip()
-        return ok({"answer": answer, "modelId": MODEL_ID, "playersUsed": len(players_ctx)})
-    except (ClientError, BotoCoreError) as e:
-        logger.exception("Bedrock error")
-        return bad(502, f"Bedrock error: {short_error(e)}")
+        answer, cached = generate_insight(system_msgs, prompt, force_refresh)
+        return ok({"answer": answer, "modelId": MODEL_ID, "playersUsed": len(players_ctx), "cached": cached})
     except Exception as e:
+        if _is_aws_error(e):
+            logger.exception("Bedrock error")
+            return bad(502, f"Bedrock error: {short_error(e)}")
         logger.exception("Unexpected error")
         return bad(500, f"Internal error: {type(e).__name__}")
+
+def ep_ai_insight_stream(event: Dict[str, Any]): # Same request as ep_ai_insight, answered as an SSE stream of partial text
+    '''
+        ep_ai_insight_stream -> Response whose body is an iterator of SSE chunks (stream_insight), errors before the model call are plain JSON
+        Only served by the response-streaming front (stream.py behind a Function URL), API Gateway buffers every body
+    '''
+    if not MODEL_ID:
+        return bad(500, "MODEL_ID env var is not set")
+    body = parse_body(event)
+
+    prompt = body.get("prompt")
+    if not isinstance(prompt, str) or not prompt.strip():
+        return bad(400, "prompt (string) is required")
+
+    session_id = body.get("sessionId")
+    players_ctx = query_session(session_id) if session_id else []
+    system_msgs = _system_messages(players_ctx)
+    force_refresh = bool(body.get("forceRefresh", False))
+
+    cache_key = insight_key(MODEL_ID, system_msgs, prompt, INFERENCE_CONFIG)
+    headers = {**cors(), "Content-Type": "text/event-stream", "Cache-Control": "no-cache"}
+    return {"statusCode": 200, "headers": headers, "body": stream_insight(system_msgs, prompt, cache_key, not force_refresh)}
+
+def _batch_prompts(raw) -> Optional[List[Dict[str, str]]]: # Normalizes [str | {id, prompt}] into [{id, prompt}], None when invalid
+    if not isinstance(raw, list) or not raw or len(raw) > AI_BATCH_MAX:
+        return None
+    out = []
+    for i, item in enumerate(raw):
+        if isinstance(item, str):
+            item = {"prompt": item}
+        if not isinstance(item, dict) or not isinstance(item.get("prompt"), str) or not item["prompt"].strip():
+            return None
+        out.append({"id": str(item.get("id", i)), "prompt": item["prompt"]})
+    return out
+
+def _batch_one(system_msgs, item: Dict[str, str], force_refresh: bool) -> Dict[str, Any]: # Never raises, errors become part of the result
+    try:
+        answer, cached = generate_insight(system_msgs, item["prompt"], force_refresh)
+        return {"id": item["id"], "answer": answer, "cached": cached}
+    except Exception as e:
+        if _is_aws_error(e):
+            logger.exception("Bedrock error for prompt %s", item["id"])
+            return {"id": item["id"], "error": f"Bedrock error: {short_error(e)}"}
+        logger.exception("Unexpected error for prompt %s", item["id"])
+        return {"id": item["id"], "error": f"Internal error: {type(e).__name__}"}
+
+def ep_ai_insight_batch(event: Dict[str, Any]): # This endpoint will run several prompts (solo per player + group) against one session in one call
+    if not MODEL_ID:
+        return bad(500, "MODEL_ID env var is not set")
+    body = parse_body(event)
+
+    prompts = _batch_prompts(body.get("prompts"))
+    if prompts is None:
+        return bad(400, f"prompts must be a list of 1-{AI_BATCH_MAX} non-empty strings or {{id, prompt}} objects")
+
+    # Session context is loaded and rendered once for every prompt
+    session_id = body.get("sessionId")
+    players_ctx = query_session(session_id) if session_id else []
+    system_msgs = _system_messages(players_ctx)
+    force_refresh = bool(body.get("forceRefresh", False))
+
+    # Bedrock calls run concurrently, so wall-clock time is close to the slowest single prompt
+    with ThreadPoolExecutor(max_workers=max(1, min(AI_BATCH_WORKERS, len(prompts)))) as pool:
+        futures = [pool.submit(trace.bind(_batch_one), system_msgs, item, force_refresh) for item in prompts]
+        results = [f.result() for f in futures]
+
+    return ok({"sessionId": session_id, "modelId": MODEL_ID, "playersUsed": len(players_ctx), "results": results})
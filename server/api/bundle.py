@@ -0,0 +1,92 @@
+# summsync/api/bundle.py
+import json, os, logging
+from typing import Any, Dict, Optional, Tuple
+from core.player import Player, MATCH_COUNT
+from core.cache import LRUCache, SingleFlight
+from core import trace
+from store.history import get_history_state, put_history_state
+from store.profiles import profile_key, get_profile, put_profile, acquire_profile_lease, release_profile_lease, wait_for_profile
+
+logger = logging.getLogger(__name__)
+PLAYER_CACHE_TTL_SECS = int(os.environ.get("PLAYER_CACHE_TTL_SECS", "600")) # How long a computed bundle is reused across sessions
+_BUNDLES = LRUCache(256, ttl=PLAYER_CACHE_TTL_SECS)
+_FLIGHTS = SingleFlight() # One computation per profile key at a time in this instance
+
+def compute_player_bundle(name: str, tag: str, mastery_count: int, puuid: Optional[str] = None, force_refresh: bool = False,
+                          match_count: int = MATCH_COUNT): # Will apply Player Class and operation to all Players
+    with trace.span("player.compute"):
+        return _compute_player_bundle(name, tag, mastery_count, puuid, force_refresh, match_count)
+
+def _compute_player_bundle(name: str, tag: str, mastery_count: int, puuid: Optional[str], force_refresh: bool, match_count: int):
+    p = Player(name, tag, puuid) # Initalizes Player Class
+    if p.puuid and not force_refresh:
+        p.load_state(get_history_state(p.puuid)) # Resume from the last search, only newer games get fetched
+    p.matchHistory(match_count=match_count) # Will search match history for stats and important info
+    if p.puuid:
+        put_history_state(p.puuid, p.export_state())
+
+    total_games = p.stats.games
+    puuid = getattr(p, "puuid", None)
+
+    if total_games == 0:
+        return {"puuid": puuid, "error": {"code": "NO_RECENT_MATCHES", "message": "No recent matches returned"}}
+
+    stats = p.returnPlayerStats() # Will retreive stats from player class
+
+    mastery = []
+    try:
+        mr = p.topMastery(int(mastery_count)) # Will attempt to retreive top X champion masteries for player
+        if isinstance(mr, dict) and mr.get("statusCode") == 200:
+            mastery = json.loads(mr.get("body", "[]"))
+    except Exception as e:
+        logger.warning("Mastery parse failed for %s#%s: %s", name, tag, e)
+
+    return {"puuid": puuid, "stats": stats, "mastery": mastery}
+
+def _load_profile(key: str, name: str, tag: str, mastery_count: int, puuid: str, match_count: int) -> Tuple[Dict[str, Any], bool]:
+    hit = get_profile(key)
+    if hit is None and not acquire_profile_lease(key):
+        with trace.span("profile.leaseWait"):
+            hit = wait_for_profile(key) # Another instance is computing it, None when it gave up and the lease ran out
+    if hit is not None:
+        trace.incr("cache.profile.shared")
+        _BUNDLES.put(key, hit)
+        return hit, True
+    trace.incr("cache.profile.miss")
+
+    try:
+        bundle = compute_player_bundle(name, tag, mastery_count, puuid, False, match_count)
+    except Exception:
+        release_profile_lease(key)
+        raise
+    if bundle.get("error"):
+        release_profile_lease(key)
+        return bundle, False
+
+    _BUNDLES.put(key, bundle)
+    put_profile(key, bundle)
+    return bundle, False
+
+def load_player_bundle(name: str, tag: str, mastery_count: int, puuid: Optional[str] = None, force_refresh: bool = False,
+                       match_count: int = MATCH_COUNT) -> Tuple[Dict[str, Any], bool]:
+    '''
+        load_player_bundle -> Player bundle shared by every session: in-process LRU, then the PUUID-keyed profile table, else computed
+        Concurrent requests for one profile share a single computation (SingleFlight here, a lease in the profile table across instances)
+        Returns (bundle, from_cache), error bundles are returned but never cached
+    '''
+    if not puuid or force_refresh:
+        bundle = compute_player_bundle(name, tag, mastery_count, puuid, force_refresh, match_count)
+        if puuid and not bundle.get("error"): # A forced refresh still refreshes the shared profile
+            key = profile_key(puuid, mastery_count, match_count)
+            _BUNDLES.put(key, bundle)
+            put_profile(key, bundle)
+        return bundle, False
+
+    key = profile_key(puuid, mastery_count, match_count)
+    hit = _BUNDLES.get(key)
+    if hit is not None:
+        trace.incr("cache.profile.local")
+        return hit, True
+
+    (bundle, cached), shared = _FLIGHTS.do(key, lambda: _load_profile(key, name, tag, mastery_count, puuid, match_count))
+    return bundle, cached or (shared and not bundle.get("error"))
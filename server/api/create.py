@@ -1,14 +1,173 @@
 # summsync/api/create.py
-import os, json, base64, uuid, logging
-from typing import Any, Dict
-from core.player import Player
-from store.session import put_session_player, get_item_by_puuid
-from api.shared import ok, bad, parse_body, compute_player_bundle
+import os, json, uuid, logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+from core.player import MATCH_COUNT, MAX_MATCH_COUNT
+from store.session import batch_get_session_players, batch_put_session_players, get_item_by_puuid, put_session_player
+from store.jobs import create_job, update_job_player, set_job_status, get_job
+from core.utils import get_puuid
+from api.shared import ok, bad, parse_body
+from api.bundle import load_player_bundle
+from core import trace
+from core.concurrency import map_concurrent, PLAYER_FETCH_WORKERS
 
 logger = logging.getLogger(__name__)
 MASTERY_COUNT = int(os.environ.get("MASTERY_COUNT", "3"))
 RIOT_API_KEY  = os.environ.get("RIOT_API_KEY")
 SESSION_REQUIRED = False  # Auto-Create if not created
+CREATE_QUEUE_URL = os.environ.get("CREATE_QUEUE_URL") # SQS queue for async creates, unset runs them on a local thread pool (dev only)
+ON_LAMBDA = bool(os.environ.get("AWS_LAMBDA_FUNCTION_NAME")) # Lambda freezes background threads once the response is returned
+
+_sqs_client = None
+_job_pool = None
+
+def _resolve_player(idx: int, rec: Dict[str, Any]) -> Dict[str, Any]: # Resolves the PUUID (cached), or returns the error result entry
+    name = (rec or {}).get("playerName")
+    tag  = (rec or {}).get("gameTag")
+    if not name or not tag:
+        return {"index": idx, "error": "playerName and gameTag required"}
+
+    try:
+        puuid = get_puuid(name, tag)
+    except Exception as e:
+        logger.exception("PUUID lookup failed for %s#%s", name, tag)
+        return {"playerName": name, "gameTag": tag,
+                "error": {"code": "PROCESSING_ERROR", "message": str(e)},
+                "stats": None, "mastery": None, "stored": False}
+
+    if not isinstance(puuid, str) or not puuid:
+        return {"playerName": name, "gameTag": tag,
+                "error": {"code": "NO_PUUID", "message": "Could not resolve PUUID"},
+                "stored": False}
+    return {"playerName": name, "gameTag": tag, "puuid": puuid}
+
+def _build_player(player: Dict[str, Any], existing: Optional[Dict[str, Any]], mastery_count: int, force_refresh: bool,
+                  match_count: int = MATCH_COUNT) -> Tuple[Dict[str, Any], bool]: # Result entry for a resolved player + whether it still has to be stored
+    name, tag, puuid = player["playerName"], player["gameTag"], player["puuid"]
+
+    if existing: # Already stored in this session
+        return {
+            "playerName": existing["playerName"], "gameTag": existing["gameTag"],
+            "puuid": puuid, "stats": existing["stats"], "mastery": existing["mastery"],
+            "stored": True, "fromCache": True
+        }, False
+
+    try:
+        # Same player searched recently in any session is reused, otherwise computed once even under concurrent searches
+        bundle, from_cache = load_player_bundle(name, tag, mastery_count, puuid, force_refresh, match_count)
+        if bundle.get("error"):
+            return {"playerName": name, "gameTag": tag, "puuid": puuid, "error": bundle["error"], "stats": None, "mastery": None, "stored": False}, False
+
+        return {
+            "playerName": name, "gameTag": tag, "puuid": puuid,
+            "stats": bundle["stats"], "mastery": bundle["mastery"],
+            "stored": True, "fromCache": from_cache
+        }, True
+
+    except Exception as e:
+        logger.exception("create failed for %s#%s", name, tag)
+        return {
+            "playerName": name, "gameTag": tag,
+            "error": {"code": "PROCESSING_ERROR", "message": str(e)},
+            "stats": None, "mastery": None, "stored": False
+        }, False
+
+def _run_job_player(job_id: str, session_id: str, idx: int, rec: Dict[str, Any], options: Dict[str, Any]): # One player of an async job, stored as soon as it is ready
+    try:
+        update_job_player(job_id, idx, "running")
+        player = _resolve_player(idx, rec)
+        if player.get("error"):
+            update_job_player(job_id, idx, "error", player["error"])
+            return
+
+        force_refresh = bool(options.get("forceRefresh"))
+        existing = None if force_refresh else get_item_by_puuid(session_id, player["puuid"])
+        result, needs_store = _build_player(player, existing, int(options.get("masteryCount", MASTERY_COUNT)), force_refresh,
+                                            int(options.get("matchCount", MATCH_COUNT)))
+        if result.get("error"):
+            update_job_player(job_id, idx, "error", result["error"])
+            return
+        if needs_store:
+            put_session_player(session_id, result["puuid"], result["playerName"], result["gameTag"], result["stats"], result["mastery"])
+        update_job_player(job_id, idx, "done")
+    except Exception as e:
+        logger.exception("async create failed for job %s player %d", job_id, idx)
+        update_job_player(job_id, idx, "error", {"code": "PROCESSING_ERROR", "message": str(e)})
+
+def run_create_job(job_id: str):
+    '''
+        run_create_job -> Computes every player of a pending create job (the job id is the session id)
+        Each player is stored and marked done on its own, so the status endpoint shows them as they finish
+    '''
+    job = get_job(job_id)
+    if not job:
+        logger.warning("create job %s not found", job_id)
+        return
+    set_job_status(job_id, "running")
+    map_concurrent(
+        lambda rec: _run_job_player(job_id, job_id, rec["index"], rec, job["options"]),
+        job["players"],
+        PLAYER_FETCH_WORKERS,
+    )
+    set_job_status(job_id, "done")
+
+def _run_local_job(job_id: str): # Local-pool runs get their own trace, SQS runs are traced by main.handler
+    with trace.request_trace("create-job", jobId=job_id):
+        run_create_job(job_id)
+
+def _sqs():
+    global _sqs_client
+    if _sqs_client is None:
+        import boto3
+        _sqs_client = boto3.client("sqs")
+    return _sqs_client
+
+def _local_pool() -> ThreadPoolExecutor:
+    global _job_pool
+    if _job_pool is None:
+        _job_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="create-job")
+    return _job_pool
+
+def _dispatch_job(job_id: str):
+    # Production hands the job to SQS (a Lambda consumer calls handle_create_queue), dev runs it on a local thread
+    # (ep_create never gets here on Lambda without a queue)
+    if CREATE_QUEUE_URL:
+        _sqs().send_message(QueueUrl=CREATE_QUEUE_URL, MessageBody=json.dumps({"jobId": job_id}))
+    else:
+        _local_pool().submit(_run_local_job, job_id)
+
+def handle_create_queue(event: Dict[str, Any]): # SQS consumer entry point, reports failed messages so only those are retried
+    failures = []
+    for record in event.get("Records") or []:
+        try:
+            run_create_job(json.loads(record["body"])["jobId"])
+        except Exception:
+            logger.exception("create job message %s failed", record.get("messageId"))
+            failures.append({"itemIdentifier": record.get("messageId")})
+    return {"batchItemFailures": failures}
+
+def ep_create_status(event: Dict[str, Any]): # This endpoint will report the progress of an async create, per player
+    body = parse_body(event)
+    session_id = body.get("sessionId")
+    if not session_id:
+        return bad(400, "sessionId is required.")
+
+    job = get_job(session_id)
+    if not job:
+        return ok({"error": "NOT_FOUND", "message": "No create job for this session."}, 404)
+
+    finished = sum(1 for p in job["players"] if p["status"] in ("done", "error"))
+    return ok({"sessionId": session_id, "status": job["status"], "players": job["players"],
+               "finished": finished, "total": len(job["players"]), "updatedAt": job["updatedAt"]})
+
+def _int_param(body: Dict[str, Any], name: str, default: int) -> Optional[int]: # Numbers or numeric strings, None when neither
+    value = body.get(name, default)
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
 
 def ep_create(event: Dict[str, Any]): # This endpoint will create the important info for all players received from client (Stats + Masteries)
     if not RIOT_API_KEY:
@@ -18,8 +177,14 @@ def ep_create(event: Dict[str, Any]): # This endpoint will create the important
     body = parse_body(event)
     players = body.get("players") or [] # Required
     session_id = body.get("sessionId") or str(uuid.uuid4()) # Optional
-    mastery_count = int(body.get("masteryCount", MASTERY_COUNT)) # Optional
+    mastery_count = _int_param(body, "masteryCount", MASTERY_COUNT) # Optional
     force_refresh = bool(body.get("forceRefresh", False)) # Optional
+    match_count = _int_param(body, "matchCount", MATCH_COUNT) # Optional
+
+    if mastery_count is None or mastery_count < 0:
+        return bad(400, "'masteryCount' must be a non-negative integer")
+    if match_count is None or not 1 <= match_count <= MAX_MATCH_COUNT:
+        return bad(400, f"'matchCount' must be an integer between 1 and {MAX_MATCH_COUNT}")
 
     if not players:
         return bad(400, "Body must include 'players': a non-empty list of {playerName, gameTag}")
@@ -43,52 +208,45 @@ def ep_create(event: Dict[str, Any]): # This endpoint will create the important
         if "playerName" not in rec or "gameTag" not in rec:
             return bad(400, f"'players[{i}]' is missing playerName and/or gameTag.")
 
-
-    results = []
-    for idx, rec in enumerate(players):
-        name = (rec or {}).get("playerName")
-        tag  = (rec or {}).get("gameTag")
-        if not name or not tag:
-            results.append({"index": idx, "error": "playerName and gameTag required"})
-            continue
-
+    # Async mode: return right away, players are computed in the background and tracked by /summsync/player/create/status
+    if body.get("async"):
+        if ON_LAMBDA and not CREATE_QUEUE_URL: # A local thread would be frozen with the job left pending until it goes stale
+            return bad(501, "Async create needs CREATE_QUEUE_URL on this deployment, send the request without 'async'.")
+        options = {"masteryCount": mastery_count, "matchCount": match_count, "forceRefresh": force_refresh}
+        if not create_job(session_id, players_in, options):
+            return bad(409, "A create job for this session is still running, poll /summsync/player/create/status.")
         try:
-            bundle = compute_player_bundle(name, tag, mastery_count) # Peform Tasks on each player, then bundle them together
-            puuid = bundle.get("puuid")
-
-            if not puuid:
-                results.append({"playerName": name, "gameTag": tag,
-                                "error": {"code": "NO_PUUID", "message": "Could not resolve PUUID"},
-                                "stored": False})
-                continue
-
-            if bundle.get("error"):
-                results.append({"playerName": name, "gameTag": tag, "puuid": puuid, "error": bundle["error"], "stats": None, "mastery": None, "stored": False})
-                continue
-
-            if not force_refresh:
-                existing = get_item_by_puuid(session_id, puuid)
-                if existing:
-                    results.append({
-                        "playerName": existing["playerName"], "gameTag": existing["gameTag"],
-                        "puuid": puuid, "stats": existing["stats"], "mastery": existing["mastery"],
-                        "stored": True, "fromCache": True
-                    })
-                    continue
-
-            put_session_player(session_id, puuid, name, tag, bundle["stats"], bundle["mastery"])
-            results.append({
-                "playerName": name, "gameTag": tag, "puuid": puuid,
-                "stats": bundle["stats"], "mastery": bundle["mastery"],
-                "stored": True, "fromCache": False
-            })
-
+            _dispatch_job(session_id)
         except Exception as e:
-            logger.exception("create failed for %s#%s", name, tag)
-            results.append({
-                "playerName": name, "gameTag": tag,
-                "error": {"code": "PROCESSING_ERROR", "message": str(e)},
-                "stats": None, "mastery": None, "stored": False
-            })
+            logger.exception("dispatching create job %s failed", session_id)
+            set_job_status(session_id, "error")
+            return bad(502, f"Could not queue the create job: {type(e).__name__}")
+        return ok({"sessionId": session_id, "status": "pending", "total": len(players_in)}, 202)
+
+    # 1) Resolve every PUUID (cached), so stored/cached work can be reused before anything expensive runs
+    resolved = map_concurrent(lambda pair: _resolve_player(*pair), list(enumerate(players_in)), PLAYER_FETCH_WORKERS)
+    puuids = [r["puuid"] for r in resolved if "puuid" in r and not r.get("error")]
+
+    # 2) One read for every player already stored in this session
+    existing = {} if force_refresh or not puuids else batch_get_session_players(session_id, puuids)
+
+    # 3) Players are independent, so compute the missing bundles concurrently (order of results is kept)
+    built = map_concurrent(
+        lambda r: (r, False) if r.get("error") else _build_player(r, existing.get(r["puuid"]), mastery_count, force_refresh, match_count),
+        resolved,
+        PLAYER_FETCH_WORKERS,
+    )
+    results = [result for result, _ in built]
+
+    # 4) One write for everything new
+    to_store = [result for result, needs_store in built if needs_store]
+    if to_store:
+        try:
+            batch_put_session_players(session_id, to_store)
+        except Exception as e:
+            logger.exception("session write failed for %s", session_id)
+            for result in to_store:
+                result["stored"] = False
+                result["error"] = {"code": "STORE_ERROR", "message": str(e)}
 
     return ok({"sessionId": session_id, "results": results})
@@ -10,7 +10,7 @@ def ep_mastery(event: Dict[str, Any]): # This endpoint will return the top maste
     if not session_id or not name or not tag:
         return bad(400, "sessionId, playerName, and gameTag are required.")
 
-    it = get_session_player(session_id, name, tag)
+    it = get_session_player(session_id, name, tag, ["mastery"]) # Only read the mastery payload
     if not it:
         return ok({"error": "NOT_FOUND", "message": "Player not found in this session"}, 404)
 
@@ -0,0 +1,44 @@
+# summsync/api/party.py
+from typing import Any, Dict
+from core import trace
+from core.concurrency import map_concurrent, PLAYER_FETCH_WORKERS
+from core.matrix import StatsMatrix, RATE_METRICS, to_records, np
+from core.stats import METRICS
+from store.history import get_history_state
+from store.session import query_session
+from api.shared import ok, bad, parse_body
+
+def ep_party(event: Dict[str, Any]): # This endpoint will compare every player of the session with each other and with their tier/lane
+    body = parse_body(event)
+    session_id = body.get("sessionId")
+    if not session_id:
+        return bad(400, "sessionId is required.")
+    if np is None:
+        return bad(501, "Party comparison is not available on this deployment.")
+
+    depth = body.get("matchCount") # Optional, newest N matches per player
+    if depth is not None and (isinstance(depth, bool) or not isinstance(depth, int) or depth < 1): # bool is an int subclass
+        return bad(400, "'matchCount' must be a positive integer.")
+
+    players = query_session(session_id, ["stats"])
+    if not players:
+        return ok({"error": "NOT_FOUND", "message": "No players found in this session."}, 404)
+
+    # Per-match rows live in each player's history state, the session item only has the averages
+    states = map_concurrent(get_history_state, [p["puuid"] for p in players], PLAYER_FETCH_WORKERS)
+    tiers = [((p.get("stats") or {}).get("rankedSolo") or {}).get("tier") for p in players]
+    lanes = [(p.get("stats") or {}).get("mostPlayedLane") for p in players]
+
+    with trace.span("party.matrix"):
+        m = StatsMatrix([(s or {}).get("recent") or [] for s in states], depth)
+        averages = m.averages()
+        result = zip(
+            players, tiers, m.games.tolist(),
+            to_records(averages, METRICS), to_records(m.per_minute(), RATE_METRICS), to_records(m.variance(), METRICS),
+            to_records(m.party_percentiles(averages), METRICS, 1), to_records(m.baseline_percentiles(tiers, lanes, averages), METRICS, 1),
+        )
+
+    return ok({"sessionId": session_id, "players": [{
+        "puuid": p["puuid"], "playerName": p["playerName"], "gameTag": p["gameTag"], "tier": tier, "games": int(games),
+        "averages": avg, "perMinute": rate, "variance": var, "partyPercentile": party, "tierPercentile": tier_pct,
+    } for p, tier, games, avg, rate, var, party, tier_pct in result]})
@@ -0,0 +1,21 @@
+# summsync/api/session.py
+from typing import Any, Dict
+from store.session import query_session, SESSION_FIELDS
+from api.shared import ok, bad, parse_body
+
+def ep_session(event: Dict[str, Any]): # This endpoint will return every player's stats + mastery from the current session in one read
+    body = parse_body(event)
+    session_id = body.get("sessionId")
+    if not session_id:
+        return bad(400, "sessionId is required.")
+
+    fields = body.get("fields") # Optional, e.g. ["stats"] to skip mastery
+    if fields is not None:
+        if not isinstance(fields, list) or any(f not in SESSION_FIELDS for f in fields):
+            return bad(400, f"'fields' must be a list containing any of: {', '.join(SESSION_FIELDS)}")
+
+    players = query_session(session_id, fields)
+    if not players:
+        return ok({"error": "NOT_FOUND", "message": "No players found in this session."}, 404)
+
+    return ok({"sessionId": session_id, "players": players})
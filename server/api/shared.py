@@ -1,9 +1,8 @@
 # summsync/api/shared.py
-import json, base64, os, logging
+import json, base64
 from typing import Any, Dict
-from core.player import Player
 
-logger = logging.getLogger(__name__)
+# Response helpers only: every route imports this, so it must stay light (player bundles live in api/bundle.py)
 
 def cors():
     return {
@@ -33,25 +32,3 @@ def short_error(e: Exception) -> str:
         return f"{code}: {msg}"
     except Exception:
         return str(e)
-
-def compute_player_bundle(name: str, tag: str, mastery_count: int): # Will apply Player Class and operation to all Players
-    p = Player(name, tag) # Initalizes Player Class
-    p.matchHistory() # Will search match history for stats and important info
-
-    total_games = int(getattr(p, "wins", 0)) + int(getattr(p, "loses", 0))
-    puuid = getattr(p, "puuid", None)
-
-    if total_games == 0:
-        return {"puuid": puuid, "error": {"code": "NO_RECENT_MATCHES", "message": "No recent matches returned"}}
-
-    stats = p.returnPlayerStats() # Will retreive stats from player class
-
-    mastery = []
-    try:
-        mr = p.topMastery(int(mastery_count)) # Will attempt to retreive top X champion masteries for player
-        if isinstance(mr, dict) and mr.get("statusCode") == 200:
-            mastery = json.loads(mr.get("body", "[]"))
-    except Exception as e:
-        logger.warning("Mastery parse failed for %s#%s: %s", name, tag, e)
-
-    return {"puuid": puuid, "stats": stats, "mastery": mastery}
@@ -0,0 +1,51 @@
+# summsync/bench/codec_bench.py
+'''
+    Compares the session item payload codecs: size of the stats + mastery attributes and encode/decode time
+    Run from server/: python -m bench.codec_bench [--players 5] [--number 2000]
+'''
+import argparse, random, timeit
+from core.stats import METRICS
+from store.codec import encode_value, decode_value, msgpack
+
+CODECS = ("json", "json-zlib", "msgpack")
+
+def sample_payload(seed: int):
+    rnd = random.Random(seed)
+    stats = {name: rnd.uniform(0, 20000) for name in METRICS}
+    stats.update({
+        "mostPlayedRole": "SOLO", "mostPlayedLane": "TOP", "mostPlayedGamemode": "CLASSIC",
+        "rankedSolo": {"tier": "GOLD", "rank": "II", "wins": rnd.randint(0, 200), "losses": rnd.randint(0, 200)},
+        "rankedFlex": None,
+    })
+    mastery = [{"championLevel": rnd.randint(1, 50), "championPoints": rnd.randint(1000, 900000),
+                "championName": name, "roles": ["Fighter", "Tank"], "title": f"the {name}"}
+               for name in ("Garen", "Darius", "Sett")]
+    return stats, mastery
+
+def _size(attr) -> int:
+    value = attr.get("S") if "S" in attr else attr["B"]
+    return len(value.encode("utf-8")) if isinstance(value, str) else len(value)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--players", type=int, default=5)
+    ap.add_argument("--number", type=int, default=2000, help="encode/decode rounds per codec")
+    args = ap.parse_args()
+
+    payloads = [sample_payload(i) for i in range(args.players)]
+    print(f"{'codec':<10} {'bytes/item':>10} {'encode us':>10} {'decode us':>10}")
+    for codec in CODECS:
+        if codec == "msgpack" and msgpack is None:
+            print(f"{codec:<10} {'(msgpack not installed)':>32}")
+            continue
+
+        encoded = [(encode_value(s, codec), encode_value(m, codec)) for s, m in payloads]
+        size = sum(_size(s) + _size(m) for s, m in encoded) / len(encoded)
+
+        enc = timeit.timeit(lambda: [(encode_value(s, codec), encode_value(m, codec)) for s, m in payloads], number=args.number)
+        dec = timeit.timeit(lambda: [(decode_value(s), decode_value(m)) for s, m in encoded], number=args.number)
+        per_item = args.number * len(payloads)
+        print(f"{codec:<10} {size:>10.0f} {enc / per_item * 1e6:>10.1f} {dec / per_item * 1e6:>10.1f}")
+
+if __name__ == "__main__":
+    main()
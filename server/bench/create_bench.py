@@ -0,0 +1,163 @@
+# summsync/bench/create_bench.py
+'''
+    End-to-end benchmark of /summsync/player/create through main.handler, fully offline
+    Riot is served by bench.riot_standin over local HTTP, DynamoDB and Bedrock by the in-memory fakes in bench.fakes
+    Reports p50/p99 latency, Riot + DynamoDB calls per request and peak traced allocations, for 1- and 5-player creates
+
+    cold -> every in-process cache and fake table is emptied before each request (a fresh instance, nothing stored yet)
+    warm -> the players were created once already, each request is a new session (popular players, shared caches)
+
+    Run from server/: python -m bench.create_bench [--iterations 20] [--riot-latency-ms 0] [--fixtures DIR] [--json]
+'''
+import os, io, json, time, argparse, tempfile, tracemalloc, contextlib, pathlib
+from typing import Any, Dict, List
+
+def _percentile(values: List[float], pct: float) -> float: # Nearest rank
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))]
+
+def _event(path: str, body: Dict[str, Any]) -> Dict[str, Any]: # API Gateway HTTP API (v2) shape
+    return {"rawPath": path, "requestContext": {"http": {"method": "POST"}, "stage": "$default"}, "body": json.dumps(body)}
+
+def _players_in(fixtures: pathlib.Path) -> List[Dict[str, str]]:
+    players = []
+    for p in sorted((fixtures / "account").glob("*.json")):
+        acct = json.loads(p.read_text(encoding="utf-8"))
+        players.append({"playerName": acct["gameName"], "gameTag": acct["tagLine"]})
+    return players
+
+def table_keys() -> Dict[str, tuple]:
+    from store import session, history, match_cache, profiles, lookups, ai_cache, jobs
+    return {
+        session.SESS_TABLE: ("sessionId", "puuid"), history.HISTORY_TABLE: ("puuid",), match_cache.MATCH_TABLE: ("matchId",),
+        profiles.PROFILE_TABLE: ("profileKey",), lookups.LOOKUP_TABLE: ("lookupKey",), ai_cache.AI_CACHE_TABLE: ("cacheKey",),
+        jobs.JOBS_TABLE: ("jobId",),
+    }
+
+def install_fakes(dynamo, bedrock):
+    # Swaps the shared boto3 clients for the fakes (the lazy ones are simply pre-set)
+    import store.dynamo, api.ai as ai
+    store.dynamo._dynamo = dynamo
+    ai._br = bedrock
+
+def reset_caches(dynamo):
+    # Back to a fresh instance: in-process caches and every fake table emptied
+    import api.bundle as bundle, core.utils as utils
+    from store import match_cache, ai_cache
+    bundle._BUNDLES.clear()
+    utils._ACCOUNTS.local.clear()
+    utils._RANKS.local.clear()
+    match_cache._memory.clear()
+    ai_cache._memory.clear()
+    dynamo.reset()
+
+def run_scenario(handler, standin, dynamo, players, mode: str, iterations: int, match_count: int, alloc_iterations: int) -> Dict[str, Any]:
+    body = lambda i: {"sessionId": f"bench-{mode}-{len(players)}-{i}-{time.monotonic_ns()}", "players": players, "matchCount": match_count}
+
+    def once(i) -> float:
+        if mode == "cold":
+            reset_caches(dynamo)
+        start = time.perf_counter()
+        r = handler(_event("/summsync/player/create", body(i)), None)
+        elapsed = time.perf_counter() - start
+        results = json.loads(r["body"]).get("results") or []
+        if r["statusCode"] != 200 or any(x.get("error") for x in results):
+            raise RuntimeError(f"create failed: {r['statusCode']} {r['body'][:300]}")
+        return elapsed
+
+    if mode == "warm":
+        reset_caches(dynamo)
+        once(-1)
+
+    riot_before, dynamo_before = standin.total_calls(), sum(dynamo.calls.values())
+    if mode == "cold":
+        dynamo_before = 0 # reset() clears the counter before every request, it is summed below instead
+    latencies, dynamo_calls = [], 0
+    for i in range(iterations):
+        latencies.append(once(i))
+        if mode == "cold":
+            dynamo_calls += sum(dynamo.calls.values())
+    if mode == "warm":
+        dynamo_calls = sum(dynamo.calls.values()) - dynamo_before
+    riot_calls = standin.total_calls() - riot_before
+
+    # Allocation pass kept separate, tracemalloc slows every allocation down
+    peaks = []
+    tracemalloc.start()
+    try:
+        for i in range(alloc_iterations):
+            if mode == "cold":
+                reset_caches(dynamo)
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            handler(_event("/summsync/player/create", body(iterations + i)), None)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+
+    ms = [x * 1000 for x in latencies]
+    return {
+        "players": len(players), "mode": mode, "iterations": iterations,
+        "p50Ms": round(_percentile(ms, 50), 2), "p99Ms": round(_percentile(ms, 99), 2), "meanMs": round(sum(ms) / len(ms), 2),
+        "riotCallsPerRequest": round(riot_calls / iterations, 2), "dynamoCallsPerRequest": round(dynamo_calls / iterations, 2),
+        "peakAllocKiB": round(max(peaks) / 1024, 1) if peaks else None,
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--iterations", type=int, default=20)
+    ap.add_argument("--alloc-iterations", type=int, default=3)
+    ap.add_argument("--match-count", type=int, default=20)
+    ap.add_argument("--riot-latency-ms", type=float, default=0.0, help="added to every stand-in response")
+    ap.add_argument("--fixtures", help="recorded fixture directory (see bench.riot_standin), synthesized when omitted")
+    ap.add_argument("--modes", default="cold,warm")
+    ap.add_argument("--json", action="store_true", help="print results as JSON lines")
+    args = ap.parse_args()
+
+    fixtures_dir = pathlib.Path(args.fixtures) if args.fixtures else pathlib.Path(tempfile.mkdtemp(prefix="summsync-bench-"))
+    from bench.riot_standin import RiotStandIn, synthesize
+    if not args.fixtures:
+        synthesize(fixtures_dir, [(f"Bench{i}", "NA1") for i in range(5)], matches_per_player=max(40, args.match_count))
+    standin = RiotStandIn(fixtures_dir, args.riot_latency_ms / 1000).start()
+
+    os.environ.setdefault("RIOT_API_KEY", "bench")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+    os.environ.setdefault("MODEL_ID", "bench-model")
+
+    # Connection pools and limiters are created on first use, so patching the module config still applies
+    import core.riot as riot_mod, core.champions as champions
+    riot_mod.RIOT_BASE_URL = standin.base_url
+    riot_mod.RIOT_APP_RATE_LIMIT = "100000:1,1000000:120"
+    if (fixtures_dir / "champion.json").exists():
+        index = champions.build_index(json.loads((fixtures_dir / "champion.json").read_text(encoding="utf-8")))
+        champions.CHAMPION_INDEX_PATH = str(champions.write_artifact(index, fixtures_dir / champions.INDEX_FILENAME))
+
+    from bench.fakes import FakeDynamo, FakeBedrock
+    from main import handler
+    dynamo, bedrock = FakeDynamo(table_keys()), FakeBedrock()
+    install_fakes(dynamo, bedrock)
+
+    all_players = _players_in(fixtures_dir)
+    rows = []
+    try:
+        for count in (1, 5):
+            players = all_players[:count]
+            if len(players) < count:
+                continue
+            for mode in args.modes.split(","):
+                with contextlib.redirect_stdout(io.StringIO()): # Keeps the per-request trace summaries (core/trace.py) out of the table
+                    rows.append(run_scenario(handler, standin, dynamo, players, mode, args.iterations, args.match_count, args.alloc_iterations))
+    finally:
+        standin.stop()
+
+    if args.json:
+        for row in rows:
+            print(json.dumps(row))
+        return
+    print(f"{'players':>7} {'mode':>5} {'p50 ms':>9} {'p99 ms':>9} {'riot/req':>9} {'dynamo/req':>11} {'peak KiB':>9}")
+    for r in rows:
+        print(f"{r['players']:>7} {r['mode']:>5} {r['p50Ms']:>9.2f} {r['p99Ms']:>9.2f} {r['riotCallsPerRequest']:>9.2f} "
+              f"{r['dynamoCallsPerRequest']:>11.2f} {r['peakAllocKiB'] if r['peakAllocKiB'] is not None else '-':>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# summsync/bench/fakes.py
+'''
+    In-memory stand-ins for the boto3 clients on the request path (DynamoDB, Bedrock), used by the benchmarks only
+    They implement just the calls and expression forms this codebase sends, and count every call
+'''
+import re, json, time, threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from botocore.exceptions import ClientError
+
+def _plain(attr: Dict[str, Any]) -> Any: # {"S": "x"} -> "x"
+    return next(iter(attr.values()))
+
+def _names(expr: str, names: Optional[Dict[str, str]]) -> str:
+    return (names or {}).get(expr.strip(), expr.strip())
+
+class FakeDynamo:
+    '''
+        FakeDynamo -> Thread-safe dict-backed DynamoDB client
+        keys: dict -> table name -> key attribute names (hash, optional range), see bench.create_bench.table_keys
+    '''
+    def __init__(self, keys: Dict[str, Tuple[str, ...]]):
+        self.keys = keys
+        self.tables: Dict[str, Dict[tuple, Dict[str, Any]]] = {}
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.tables.clear()
+            self.calls.clear()
+
+    def _table(self, name: str) -> Dict[tuple, Dict[str, Any]]:
+        return self.tables.setdefault(name, {})
+
+    def _key(self, table: str, item: Dict[str, Any]) -> tuple:
+        return tuple(_plain(item[k]) for k in self.keys[table])
+
+    @staticmethod
+    def _project(item: Dict[str, Any], projection: Optional[str], names: Optional[Dict[str, str]]) -> Dict[str, Any]:
+        if not projection:
+            return dict(item)
+        wanted = {_names(p, names) for p in projection.split(",")}
+        return {k: v for k, v in item.items() if k in wanted}
+
+    def put_item(self, TableName, Item, **kw):
+        with self._lock:
+            self.calls["put_item"] += 1
+            self._table(TableName)[self._key(TableName, Item)] = dict(Item)
+        return {}
+
+    def get_item(self, TableName, Key, ProjectionExpression=None, ExpressionAttributeNames=None, **kw):
+        with self._lock:
+            self.calls["get_item"] += 1
+            it = self._table(TableName).get(self._key(TableName, Key))
+        return {"Item": self._project(it, ProjectionExpression, ExpressionAttributeNames)} if it else {}
+
+    def query(self, TableName, KeyConditionExpression, ExpressionAttributeValues, IndexName=None, Limit=None,
+              ProjectionExpression=None, ExpressionAttributeNames=None, **kw):
+        # Equality key conditions only ("a = :x AND b = :y"), which is all the session store sends
+        conds = [(_names(a, ExpressionAttributeNames), ExpressionAttributeValues[v.strip()])
+                 for a, v in re.findall(r"([#\w]+)\s*=\s*(:\w+)", KeyConditionExpression)]
+        with self._lock:
+            self.calls["query"] += 1
+            items = [it for it in self._table(TableName).values() if all(it.get(a) == v for a, v in conds)]
+        if Limit:
+            items = items[:Limit]
+        items = [self._project(it, ProjectionExpression, ExpressionAttributeNames) for it in items]
+        return {"Items": items, "Count": len(items)}
+
+    def batch_get_item(self, RequestItems, **kw):
+        self.calls["batch_get_item"] += 1
+        out = {}
+        for table, req in RequestItems.items():
+            with self._lock:
+                found = [self._table(table).get(self._key(table, k)) for k in req["Keys"]]
+            out[table] = [self._project(it, req.get("ProjectionExpression"), req.get("ExpressionAttributeNames"))
+                          for it in found if it]
+        return {"Responses": out, "UnprocessedKeys": {}}
+
+    def batch_write_item(self, RequestItems, **kw):
+        with self._lock:
+            self.calls["batch_write_item"] += 1
+            for table, reqs in RequestItems.items():
+                for r in reqs:
+                    if "PutRequest" in r:
+                        item = r["PutRequest"]["Item"]
+                        self._table(table)[self._key(table, item)] = dict(item)
+                    else:
+                        self._table(table).pop(self._key(table, r["DeleteRequest"]["Key"]), None)
+        return {"UnprocessedItems": {}}
+
+    def _check(self, item: Optional[Dict[str, Any]], cond: str, names, values) -> bool:
+        # "attribute_not_exists(#a) OR #a < :v" and "#a = :v" style conditions
+        for term in cond.split(" OR "):
+            term = term.strip()
+            m = re.fullmatch(r"attribute_not_exists\(([#\w]+)\)", term)
+            if m:
+                if item is None or _names(m.group(1), names) not in item:
+                    return True
+                continue
+            m = re.fullmatch(r"([#\w]+)\s*(=|<)\s*(:\w+)", term)
+            if m and item is not None and _names(m.group(1), names) in item:
+                have, want = _plain(item[_names(m.group(1), names)]), _plain(values[m.group(3)])
+                if m.group(2) == "=" and have == want:
+                    return True
+                if m.group(2) == "<" and float(have) < float(want):
+                    return True
+        return False
+
+    def update_item(self, TableName, Key, UpdateExpression, ExpressionAttributeNames=None, ExpressionAttributeValues=None,
+                    ConditionExpression=None, **kw):
+        names, values = ExpressionAttributeNames or {}, ExpressionAttributeValues or {}
+        with self._lock:
+            self.calls["update_item"] += 1
+            table = self._table(TableName)
+            key = self._key(TableName, Key)
+            item = table.get(key)
+            if ConditionExpression and not self._check(item, ConditionExpression, names, values):
+                raise ClientError({"Error": {"Code": "ConditionalCheckFailedException", "Message": "The conditional request failed"}},
+                                  "UpdateItem")
+            if item is None:
+                item = table[key] = dict(Key)
+
+            action, _, rest = UpdateExpression.strip().partition(" ")
+            for clause in rest.split(","):
+                if action == "REMOVE":
+                    item.pop(_names(clause, names), None)
+                    continue
+                lhs, rhs = (x.strip() for x in clause.split("="))
+                m = re.fullmatch(r"([#\w]+)\[(\d+)\]\.([#\w]+)", lhs) # list element field, e.g. #p[2].#s
+                if m:
+                    item[_names(m.group(1), names)]["L"][int(m.group(2))]["M"][_names(m.group(3), names)] = values[rhs]
+                else:
+                    item[_names(lhs, names)] = values[rhs]
+        return {}
+
+class FakeBedrock:
+    '''
+        FakeBedrock -> bedrock-runtime stand-in with a fixed answer
+        latency: float -> Seconds each call takes, streamed calls spread it over their chunks
+    '''
+    def __init__(self, latency: float = 0.0, answer: str = "Play safer in lane and ward the river before objectives."):
+        self.latency = latency
+        self.answer = answer
+        self.calls = Counter()
+
+    def _usage(self, system, messages) -> Dict[str, int]:
+        chars = len(json.dumps(system)) + len(json.dumps(messages))
+        return {"inputTokens": chars // 4, "outputTokens": len(self.answer) // 4, "totalTokens": (chars + len(self.answer)) // 4}
+
+    def converse(self, modelId, system, messages, inferenceConfig=None, **kw):
+        self.calls["converse"] += 1
+        time.sleep(self.latency)
+        return {"output": {"message": {"role": "assistant", "content": [{"text": self.answer}]}},
+                "stopReason": "end_turn", "usage": self._usage(system, messages), "metrics": {"latencyMs": int(self.latency * 1000)}}
+
+    def converse_stream(self, modelId, system, messages, inferenceConfig=None, **kw):
+        self.calls["converse_stream"] += 1
+        words: List[str] = self.answer.split(" ")
+
+        def events():
+            for i, word in enumerate(words):
+                time.sleep(self.latency / len(words))
+                yield {"contentBlockDelta": {"delta": {"text": word if i == 0 else " " + word}}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+            yield {"metadata": {"usage": self._usage(system, messages)}}
+        return {"stream": events()}
@@ -0,0 +1,63 @@
+# summsync/bench/history_check.py
+'''
+    Checks that stats resumed from a stored history state match a fresh compute of the same window, fully offline
+    Riot is served by bench.riot_standin from synthetic fixtures (every 10th match is ARAM, so some games do not count)
+
+    refresh -> state saved while the newest games were not played yet, then resumed once they are
+    shallower -> state saved for a deeper matchCount, then resumed for the default one
+
+    Run from server/: python -m bench.history_check [--matches 44] [--new 4]
+'''
+import os, json, argparse, tempfile, pathlib
+from typing import Any, Dict, List, Optional
+
+def _stats(puuid: str, match_count: int, state: Optional[Dict[str, Any]] = None):
+    from core.player import Player
+    p = Player("Check0", "NA1", puuid)
+    p.load_state(state)
+    p.matchHistory(match_count=match_count)
+    return p
+
+def _compare(label: str, resumed, fresh) -> bool:
+    a, b = resumed.stats.summary(), fresh.stats.summary()
+    same = resumed.stats.games == fresh.stats.games and all(abs(a[k] - b[k]) < 1e-9 if isinstance(a[k], float) else a[k] == b[k] for k in a)
+    print(f"{label:>10} games {resumed.stats.games:>3} vs {fresh.stats.games:>3}  kda {a['kda']:.4f} vs {b['kda']:.4f}  {'ok' if same else 'MISMATCH'}")
+    return same
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--matches", type=int, default=44, help="matches in the synthetic history")
+    ap.add_argument("--new", type=int, default=4, help="games played between the stored state and the refresh")
+    ap.add_argument("--match-count", type=int, default=20)
+    args = ap.parse_args()
+
+    os.environ.setdefault("RIOT_API_KEY", "bench")
+    os.environ.setdefault("MATCH_CACHE_BACKEND", "memory") # No DynamoDB needed, matches are only cached in-process
+    fixtures = pathlib.Path(tempfile.mkdtemp(prefix="summsync-check-"))
+    from bench.riot_standin import RiotStandIn, synthesize
+    synthesize(fixtures, [("Check0", "NA1")], matches_per_player=args.matches)
+    puuid = json.loads(next((fixtures / "account").glob("*.json")).read_text(encoding="utf-8"))["puuid"]
+    ids_path = fixtures / "ids" / f"{puuid}.json"
+    all_ids: List[str] = json.loads(ids_path.read_text(encoding="utf-8"))
+
+    standin = RiotStandIn(fixtures).start()
+    import core.riot as riot_mod
+    riot_mod.RIOT_BASE_URL = standin.base_url
+    riot_mod.RIOT_APP_RATE_LIMIT = "100000:1,1000000:120"
+    try:
+        ids_path.write_text(json.dumps(all_ids[args.new:]), encoding="utf-8") # Before the newest games were played
+        standin._bodies.clear()
+        before = _stats(puuid, args.match_count).export_state()
+        deep = _stats(puuid, args.match_count * 2).export_state()
+
+        ids_path.write_text(json.dumps(all_ids), encoding="utf-8")
+        standin._bodies.clear()
+        fresh = _stats(puuid, args.match_count)
+        ok = _compare("refresh", _stats(puuid, args.match_count, before), fresh)
+        ok = _compare("shallower", _stats(puuid, args.match_count, deep), fresh) and ok
+    finally:
+        standin.stop()
+    raise SystemExit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
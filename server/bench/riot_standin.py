@@ -0,0 +1,209 @@
+# summsync/bench/riot_standin.py
+'''
+    Local HTTP stand-in for the Riot endpoints the request path calls, replaying fixture responses from a directory
+    Point the app at it with RIOT_BASE_URL=http://127.0.0.1:<port>
+
+    Fixture layout, one JSON body per file exactly as Riot returned it:
+        account/<GAMENAME#TAGLINE>.json   account-v1 by-riot-id (upper-cased Riot ID, see core.keys.riot_id_key)
+        ids/<puuid>.json                  every match ID of the player, newest first (start/count/startTime applied here)
+        match/<matchId>.json              match-v5 match
+        league/<puuid>.json               league-v4 entries
+        mastery/<puuid>.json              champion-mastery-v4 top (count applied here)
+        champion.json                     Data Dragon champion list used for the mastery names
+
+    Run from server/: python -m bench.riot_standin --synthesize DIR   (writes synthetic fixtures)
+'''
+import json, time, random, argparse, threading, pathlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs, unquote
+from core.keys import riot_id_key
+
+RATE_HEADERS = {"X-App-Rate-Limit": "100000:1,1000000:120", "X-App-Rate-Limit-Count": "1:1,1:120"} # Never throttles the bench
+CHAMPIONS = [("266", "Aatrox", "the Darkin Blade", ["Fighter"]), ("103", "Ahri", "the Nine-Tailed Fox", ["Mage", "Assassin"]),
+             ("84", "Akali", "the Rogue Assassin", ["Assassin"]), ("86", "Garen", "The Might of Demacia", ["Fighter", "Tank"]),
+             ("122", "Darius", "the Hand of Noxus", ["Fighter", "Tank"]), ("875", "Sett", "the Boss", ["Fighter", "Tank"])]
+
+def _write(path: pathlib.Path, body):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(body), encoding="utf-8")
+
+def synthesize(out_dir, players: List[Tuple[str, str]], matches_per_player: int = 40, seed: int = 7) -> pathlib.Path:
+    '''
+        synthesize -> Writes deterministic fixtures for these Riot IDs (full-size participants, challenges included)
+        The players share their matches, like a premade group would
+    '''
+    out = pathlib.Path(out_dir)
+    rnd = random.Random(seed)
+    puuids = {riot_id_key(n, t): f"bench-{n.lower()}-{t.lower()}-{i:04d}".ljust(78, "x") for i, (n, t) in enumerate(players)}
+    fillers = [(f"Filler{i}", "NA1") for i in range(10)]
+    now_ms = 1_760_000_000_000
+
+    match_ids = [f"NA1_{5_400_000_000 + i}" for i in range(matches_per_player)]
+    for i, match_id in enumerate(match_ids):
+        lobby = (players + fillers)[:10]
+        duration = rnd.randint(900, 2400)
+        end = now_ms - i * 3_600_000
+        participants = []
+        for j, (name, tag) in enumerate(lobby):
+            puuid = puuids.get(riot_id_key(name, tag)) or f"filler-{j:02d}".ljust(78, "x")
+            participants.append({
+                "puuid": puuid, "riotIdGameName": name, "riotIdTagline": tag, "championId": int(rnd.choice(CHAMPIONS)[0]),
+                "win": j < 5 if i % 2 else j >= 5, "lane": rnd.choice(["TOP", "JUNGLE", "MIDDLE", "BOTTOM"]),
+                "role": rnd.choice(["SOLO", "NONE", "CARRY", "SUPPORT"]), "teamPosition": rnd.choice(["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]),
+                "kills": rnd.randint(0, 15), "deaths": rnd.randint(0, 12), "assists": rnd.randint(0, 20),
+                "totalDamageDealt": rnd.randint(50_000, 250_000), "goldEarned": rnd.randint(5_000, 16_000),
+                "longestTimeSpentLiving": rnd.randint(100, 1_200), "visionScore": rnd.randint(0, 60),
+                "wardsPlaced": rnd.randint(0, 20), "wardsKilled": rnd.randint(0, 8), "totalMinionsKilled": rnd.randint(0, 250),
+                "firstBloodKill": rnd.random() < 0.1, "firstTowerKill": rnd.random() < 0.1,
+                "damageDealtToObjectives": rnd.randint(0, 20_000),
+                # match-v5 sends ~120 challenge values per participant, the pipeline reads six of them
+                "challenges": dict({f"challenge{k:03d}": rnd.random() * 100 for k in range(120)}, **{
+                    "kda": rnd.uniform(0.5, 6), "killParticipation": rnd.random(), "goldPerMinute": rnd.uniform(250, 500),
+                    "bountyGold": rnd.randint(0, 800), "visionScorePerMinute": rnd.random() * 2, "controlWardsPlaced": rnd.randint(0, 5),
+                }),
+            })
+        _write(out / "match" / f"{match_id}.json", {
+            "metadata": {"dataVersion": "2", "matchId": match_id, "participants": [p["puuid"] for p in participants]},
+            "info": {"gameMode": "CLASSIC" if i % 10 else "ARAM", "gameDuration": duration, "gameStartTimestamp": end - duration * 1000,
+                     "gameEndTimestamp": end, "queueId": 420, "participants": participants},
+        })
+
+    for (name, tag) in players:
+        key = riot_id_key(name, tag)
+        puuid = puuids[key]
+        _write(out / "account" / f"{key}.json", {"puuid": puuid, "gameName": name, "tagLine": tag})
+        _write(out / "ids" / f"{puuid}.json", match_ids)
+        _write(out / "league" / f"{puuid}.json", [{"queueType": "RANKED_SOLO_5x5", "tier": "GOLD", "rank": "II",
+                                                   "leaguePoints": 40, "wins": 31, "losses": 29}])
+        _write(out / "mastery" / f"{puuid}.json", [{"puuid": puuid, "championId": int(cid), "championLevel": 20 - k,
+                                                    "championPoints": 200_000 - k * 25_000} for k, (cid, *_) in enumerate(CHAMPIONS)])
+
+    _write(out / "champion.json", {"data": {name: {"key": cid, "name": name, "title": title, "tags": tags}
+                                            for cid, name, title, tags in CHAMPIONS}})
+    return out
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256 # The default backlog of 5 drops connects under a 5-player fan-out (1s SYN retry)
+
+class RiotStandIn:
+    '''
+        RiotStandIn -> Threaded HTTP server answering Riot paths from a fixture directory
+        latency: float -> Seconds added to every response, to mimic the network round trip
+        calls: Counter -> Requests served per Riot method (account, ids, match, league, mastery)
+    '''
+    def __init__(self, fixtures, latency: float = 0.0, port: int = 0):
+        self.fixtures = pathlib.Path(fixtures)
+        self.latency = latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._bodies: Dict[str, Optional[bytes]] = {}
+        self._server = _Server(("127.0.0.1", port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "RiotStandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="riot-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def _fixture(self, *parts: str) -> Optional[bytes]:
+        rel = "/".join(parts)
+        if rel not in self._bodies:
+            p = self.fixtures.joinpath(*parts)
+            self._bodies[rel] = p.read_bytes() if p.exists() else None
+        return self._bodies[rel]
+
+    def route(self, url: str) -> Tuple[str, Optional[bytes]]:
+        u = urlsplit(url)
+        q = parse_qs(u.query)
+        path = unquote(u.path)
+        seg = path.strip("/").split("/")
+
+        if "/accounts/by-riot-id/" in path:
+            return "account", self._fixture("account", f"{riot_id_key(seg[-2], seg[-1])}.json")
+        if path.endswith("/ids"):
+            raw = self._fixture("ids", f"{seg[-2]}.json")
+            if raw is None:
+                return "ids", None
+            ids = json.loads(raw)
+            if "startTime" in q: # Riot filters on game start, in epoch seconds
+                since = int(q["startTime"][0]) * 1000
+                ids = [m for m in ids if json.loads(self._fixture("match", f"{m}.json") or b"{}")
+                       .get("info", {}).get("gameStartTimestamp", 0) >= since]
+            start, count = int(q.get("start", ["0"])[0]), int(q.get("count", ["20"])[0])
+            return "ids", json.dumps(ids[start:start + count]).encode()
+        if "/lol/match/v5/matches/" in path:
+            return "match", self._fixture("match", f"{seg[-1]}.json")
+        if "/entries/by-puuid/" in path:
+            return "league", self._fixture("league", f"{seg[-1]}.json") or b"[]"
+        if "/champion-masteries/by-puuid/" in path:
+            raw = self._fixture("mastery", f"{seg[-2]}.json")
+            if raw is None:
+                return "mastery", b"[]"
+            return "mastery", json.dumps(json.loads(raw)[:int(q.get("count", ["3"])[0])]).encode()
+        return "unknown", None
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, like Riot, so the client's connection pool is exercised
+
+            def do_GET(self):
+                method, body = standin.route(self.path)
+                with standin._lock:
+                    standin.calls[method] += 1
+                if standin.latency:
+                    time.sleep(standin.latency)
+                status = 200 if body is not None else 404
+                body = body if body is not None else b'{"status":{"message":"Data not found","status_code":404}}'
+                self.send_response(status)
+                for k, v in RATE_HEADERS.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args): # Quiet
+                pass
+
+        return Handler
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--synthesize", metavar="DIR", help="write synthetic fixtures to DIR and exit")
+    ap.add_argument("--fixtures", metavar="DIR", help="serve fixtures from DIR")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    args = ap.parse_args()
+
+    if args.synthesize:
+        out = synthesize(args.synthesize, [(f"Bench{i}", "NA1") for i in range(5)])
+        print(f"Wrote fixtures to {out}")
+        return
+    if not args.fixtures:
+        ap.error("--fixtures or --synthesize is required")
+
+    standin = RiotStandIn(args.fixtures, args.latency_ms / 1000, args.port).start()
+    print(f"Serving {args.fixtures} on {standin.base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        standin.stop()
+
+if __name__ == "__main__":
+    main()
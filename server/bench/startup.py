@@ -0,0 +1,69 @@
+# summsync/bench/startup.py
+'''
+    Cold-start import cost per route: each sample is a fresh interpreter that imports main and loads one route's endpoint
+    Reports the median import time, modules loaded and whether boto3 / botocore got imported along the way
+    --max-ms fails the run (exit 1) when a route's median goes over budget, so cold-start regressions are caught
+
+    Run from server/: python -m bench.startup [--samples 5] [--max-ms 0] [--json]
+'''
+import os, sys, json, argparse, statistics, subprocess
+
+# Runs in the child interpreter: time to import main + resolve the route (no request is made, nothing is networked)
+_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import main
+after_main = time.perf_counter()
+fn = main._endpoint(sys.argv[1], sys.argv[2]) if sys.argv[1] != "-" else None
+end = time.perf_counter()
+print(json.dumps({"mainMs": (after_main - start) * 1000, "totalMs": (end - start) * 1000, "modules": len(sys.modules),
+                  "boto3": "boto3" in sys.modules, "botocore": "botocore" in sys.modules}))
+"""
+
+def probe(method: str, path: str, samples: int, cwd: str):
+    runs = []
+    env = dict(os.environ, AWS_DEFAULT_REGION=os.environ.get("AWS_DEFAULT_REGION", "us-west-2"))
+    for _ in range(samples):
+        out = subprocess.run([sys.executable, "-c", _PROBE, method, path], cwd=cwd, env=env,
+                             capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "route": f"{method} {path}" if method != "-" else "(import main)",
+        "medianMs": round(statistics.median(r["totalMs"] for r in runs), 1),
+        "maxMs": round(max(r["totalMs"] for r in runs), 1),
+        "modules": runs[-1]["modules"], "boto3": runs[-1]["boto3"], "botocore": runs[-1]["botocore"],
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--samples", type=int, default=5)
+    ap.add_argument("--max-ms", type=float, default=0.0, help="fail when a route's median import time is above this (0 = report only)")
+    ap.add_argument("--json", action="store_true", help="print results as JSON lines")
+    args = ap.parse_args()
+
+    server_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, server_dir)
+    from main import ROUTES
+
+    rows = [probe("-", "-", args.samples, server_dir)]
+    seen = set()
+    for (method, path), spec in ROUTES.items():
+        if spec in seen: # Routes sharing an endpoint load the same modules
+            continue
+        seen.add(spec)
+        rows.append(probe(method, path, args.samples, server_dir))
+
+    over = [r for r in rows if args.max_ms and r["medianMs"] > args.max_ms]
+    if args.json:
+        for r in rows:
+            print(json.dumps(r))
+    else:
+        print(f"{'route':<36} {'median ms':>10} {'max ms':>8} {'modules':>8} {'boto3':>6}")
+        for r in rows:
+            print(f"{r['route']:<36} {r['medianMs']:>10.1f} {r['maxMs']:>8.1f} {r['modules']:>8} {str(r['boto3']):>6}")
+    if over:
+        print(f"Over the {args.max_ms} ms budget: {', '.join(r['route'] for r in over)}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# summsync/core/baseline.py
+import os, json, logging, pathlib, threading
+from typing import Any, Dict, Optional, Sequence, Tuple
+from core.stats import METRICS
+
+try: # Optional, percentile comparisons are skipped when the layer does not ship numpy
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+BASELINE_PATH = os.environ.get("BASELINE_PATH") # Quantile grid (.npy), its index sits next to it as <name>.json
+ALL_TIERS = "ALL" # Group every tier falls back to when it has no baseline of its own
+TIERS = ("IRON", "BRONZE", "SILVER", "GOLD", "PLATINUM", "EMERALD", "DIAMOND", "MASTER", "GRANDMASTER", "CHALLENGER")
+
+_BASELINE: Optional[Tuple[Any, Dict[str, Any]]] = None # (memory-mapped grid, index)
+_lock = threading.Lock()
+
+def index_path(grid_path) -> pathlib.Path:
+    return pathlib.Path(grid_path).with_suffix(".json")
+
+def write_baseline(grid, quantiles: Sequence[float], groups: Dict[str, int], out_path, **meta) -> pathlib.Path:
+    '''
+        write_baseline -> Writes a quantile grid + its JSON index, the artifact load_baseline memory-maps
+        grid: array -> float32 (groups, quantiles, metrics), metrics ordered like METRICS
+        quantiles: list -> Quantile levels of axis 1, ascending in [0, 1]
+        groups: dict -> Group name (see group_name, e.g. "GOLD", "GOLD/JUNGLE", ALL_TIERS) -> row of axis 0
+    '''
+    out_path = pathlib.Path(out_path)
+    grid = np.ascontiguousarray(grid, dtype=np.float32)
+    if grid.shape != (len(groups), len(quantiles), len(METRICS)):
+        raise ValueError(f"Baseline grid shape {grid.shape} does not match {len(groups)} groups x {len(quantiles)} quantiles x {len(METRICS)} metrics")
+    np.save(out_path, grid, allow_pickle=False)
+    index = {"metrics": list(METRICS), "quantiles": [float(q) for q in quantiles], "groups": dict(groups), **meta}
+    index_path(out_path).write_text(json.dumps(index), encoding="utf-8")
+    return out_path
+
+def group_name(tier: Optional[str], lane: Optional[str] = None) -> str:
+    # "TIER" or "TIER/LANE", lane being the match-v5 participant "lane" (what mostPlayedLane reports)
+    tier = (tier or ALL_TIERS).upper()
+    return f"{tier}/{lane.upper()}" if lane else tier
+
+def _read(path: str) -> Tuple[Any, Dict[str, Any]]:
+    grid = np.load(path, mmap_mode="r", allow_pickle=False) # Pages are read on first touch, a lookup only touches its group
+    index = json.loads(index_path(path).read_text(encoding="utf-8"))
+    return grid, index
+
+def load_baseline() -> Optional[Tuple[Any, Dict[str, Any]]]:
+    '''
+        load_baseline -> (grid, index) of the configured baseline, None when there is none or it cannot be read
+        Loaded once per instance
+    '''
+    global _BASELINE
+    if _BASELINE is not None:
+        return _BASELINE or None
+    if np is None or not BASELINE_PATH:
+        return None
+    with _lock:
+        if _BASELINE is None:
+            try:
+                _BASELINE = _read(BASELINE_PATH)
+            except Exception as e:
+                logger.warning("Baseline %s could not be loaded: %s", BASELINE_PATH, e)
+                _BASELINE = () # Not retried on every request
+    return _BASELINE or None
+
+def quantile_grid(tier: Optional[str], lane: Optional[str] = None):
+    '''
+        quantile_grid -> (quantiles, grid) for a tier (and lane), grid is (quantiles, metrics) ordered like METRICS
+        Falls back tier/lane -> tier -> ALL/lane -> ALL when a group was too small to be built, None when none exists
+    '''
+    loaded = load_baseline()
+    if loaded is None:
+        return None
+    grid, index = loaded
+    groups = index["groups"]
+    candidates = (group_name(tier, lane), group_name(tier), group_name(None, lane), ALL_TIERS)
+    row = next((groups[g] for g in candidates if g in groups), None)
+    if row is None:
+        return None
+
+    table = grid[row]
+    if index["metrics"] != list(METRICS): # Built before metrics were added/reordered, those missing come back as NaN
+        cols = {name: i for i, name in enumerate(index["metrics"])}
+        table = np.stack([table[:, cols[m]] if m in cols else np.full(table.shape[0], np.nan, np.float32) for m in METRICS], axis=1)
+    return np.asarray(index["quantiles"], dtype=np.float64), table
+
+def percentile_of(values, levels, grid):
+    '''
+        percentile_of -> Where values (n, metrics) fall within grid (quantiles, metrics), in the units of levels
+        Linear between the neighbouring quantiles, clamped to the first/last level, NaN for NaN values or metrics
+    '''
+    q = grid.shape[0]
+    pos = np.sum(grid[None, :, :] <= values[:, None, :], axis=1) # Quantiles at or below each value
+    lo, hi = np.clip(pos - 1, 0, q - 1), np.clip(pos, 0, q - 1)
+    cols = np.arange(grid.shape[1])[None, :]
+    lo_v, hi_v = grid[lo, cols], grid[hi, cols]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        frac = np.where(hi_v > lo_v, (values - lo_v) / (hi_v - lo_v), 0.0)
+    out = levels[lo] + frac * (levels[hi] - levels[lo])
+    return np.where(np.isnan(values) | np.isnan(lo_v), np.nan, out)
+
+def stat_percentiles(stats: Dict[str, Any], tier: Optional[str], lane: Optional[str] = None) -> Optional[Dict[str, float]]:
+    '''
+        stat_percentiles -> {metric: percentile 0-100} of one player's per-game averages (returnPlayerStats output)
+        None when no baseline is available, metrics without a value or baseline are left out
+    '''
+    found = quantile_grid(tier, lane)
+    if found is None:
+        return None
+    levels, grid = found
+    values = np.array([[stats.get(m) if isinstance(stats.get(m), (int, float)) else np.nan for m in METRICS]], dtype=np.float64)
+    pct = percentile_of(values, levels * 100, np.asarray(grid, dtype=np.float64))[0]
+    return {m: float(v) for m, v in zip(METRICS, pct) if v == v}
@@ -0,0 +1,141 @@
+# summsync/core/baseline_build.py
+'''
+    Offline batch job: per-tier/lane baseline distributions of every METRIC from a local corpus of match-v5 JSON
+    Writes the quantile grid + JSON index that core.baseline memory-maps (BASELINE_PATH) on the request path
+
+    Corpus: any tree of *.json (one match each) and *.jsonl (one match per line) files, optionally gzipped
+    Tiers (match-v5 does not carry them) come from --tiers (JSON {puuid: tier}) or a directory named after the tier,
+    e.g. corpus/GOLD/NA1_123.json; participants without a tier only feed the ALL groups
+
+    Files are split into batches across a process pool; each worker streams its files one match at a time and
+    returns per-player sums only, so memory follows the number of players, not the corpus size.
+    Distributions are over per-player averages (>= --min-games counted games), the same quantity a
+    player's stats hold, so a percentile answers "better than X% of GOLD junglers".
+
+    Run from server/: python -m core.baseline_build CORPUS_DIR OUT.npy [--workers N] [--tiers tiers.json]
+'''
+import os, sys, gzip, json, time, argparse, pathlib
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from core.stats import METRICS, match_row, is_counted
+from core.baseline import TIERS, group_name, write_baseline
+
+QUANTILES = tuple(i / 100 for i in range(101)) # Every percentile, 101 x 19 float32 = ~7.7 KiB per group
+BATCH_FILES = 64 # Files per worker task, large enough to amortize the pickled partial sums
+
+_W, _L = METRICS.index("winRate"), METRICS.index("loseRate")
+
+Key = Tuple[str, Optional[str], str] # (puuid, tier, lane)
+
+def _corpus_files(root: pathlib.Path) -> List[pathlib.Path]:
+    return sorted(p for p in root.rglob("*") if p.is_file() and p.name.endswith((".json", ".jsonl", ".json.gz", ".jsonl.gz")))
+
+def _open(path: pathlib.Path):
+    return gzip.open(path, "rt", encoding="utf-8") if path.suffix == ".gz" else path.open("r", encoding="utf-8")
+
+def _iter_file(path: pathlib.Path) -> Iterator[dict]:
+    # Streams a file: .jsonl line by line, a .json file is a single match
+    with _open(path) as f:
+        if ".jsonl" in path.suffixes:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield json.load(f)
+
+def _path_tier(path: pathlib.Path) -> Optional[str]:
+    return next((part.upper() for part in reversed(path.parent.parts) if part.upper() in TIERS), None)
+
+def _scan(args: Tuple[List[str], Dict[str, str]]) -> Tuple[Dict[Key, List[float]], int, int]:
+    # Worker: per (puuid, tier, lane) metric sums over a batch of files, plus matches read / skipped
+    paths, tiers = args
+    sums: Dict[Key, List[float]] = {}
+    read = skipped = 0
+    for raw in paths:
+        path = pathlib.Path(raw)
+        dir_tier = _path_tier(path)
+        try:
+            for match in _iter_file(path):
+                read += 1
+                info = match.get("info") or {}
+                if not is_counted(info):
+                    skipped += 1
+                    continue
+                for p in info.get("participants") or []:
+                    puuid = p.get("puuid")
+                    if not puuid:
+                        continue
+                    key = (puuid, tiers.get(puuid, dir_tier), p.get("lane", "NONE"))
+                    acc = sums.get(key)
+                    if acc is None:
+                        acc = sums[key] = [0.0] * len(METRICS)
+                    for i, value in enumerate(match_row(p, info)):
+                        acc[i] += value
+        except (OSError, ValueError) as e: # Truncated/corrupt files are reported and left out, not fatal
+            print(f"skipping {path}: {e}", file=sys.stderr)
+    return sums, read, skipped
+
+def _groups_of(tier: Optional[str], lane: str) -> Tuple[str, ...]:
+    groups = (group_name(None), group_name(None, lane))
+    return groups + (group_name(tier), group_name(tier, lane)) if tier else groups
+
+def build(corpus, out_path, workers: Optional[int] = None, tiers: Optional[Dict[str, str]] = None,
+          min_games: int = 3, min_players: int = 30) -> Dict[str, int]:
+    '''
+        build -> Scans the corpus in parallel and writes the baseline artifact, returns {group: players}
+        min_games: int -> Counted games a player needs in a group to be part of its distribution
+        min_players: int -> Smaller groups are left out, lookups fall back to a wider group (see core.baseline.quantile_grid)
+    '''
+    files = [str(p) for p in _corpus_files(pathlib.Path(corpus))]
+    if not files:
+        raise FileNotFoundError(f"No match files under {corpus}")
+    tiers = {k: v.upper() for k, v in (tiers or {}).items()}
+    batches = [(files[i:i + BATCH_FILES], tiers) for i in range(0, len(files), BATCH_FILES)]
+
+    # Per player and group: the sums of every lane/tier key that rolls up into it
+    players: Dict[Tuple[str, str], np.ndarray] = {}
+    read = skipped = 0
+    workers = max(1, min(workers or os.cpu_count() or 1, len(batches)))
+    with Pool(workers) as pool:
+        for sums, r, s in pool.imap_unordered(_scan, batches):
+            read, skipped = read + r, skipped + s
+            for (puuid, tier, lane), acc in sums.items():
+                acc = np.asarray(acc)
+                for group in _groups_of(tier, lane):
+                    total = players.get((puuid, group))
+                    players[(puuid, group)] = acc if total is None else total + acc
+
+    by_group: Dict[str, List[np.ndarray]] = {}
+    for (_, group), acc in players.items():
+        if acc[_W] + acc[_L] >= min_games:
+            by_group.setdefault(group, []).append(acc / (acc[_W] + acc[_L])) # Per-game averages, like StatsAggregator
+    kept = {g: np.stack(rows) for g, rows in sorted(by_group.items()) if len(rows) >= min_players}
+    if not kept:
+        raise ValueError(f"No group has {min_players} players with {min_games}+ games ({read} matches read)")
+
+    grid = np.stack([np.quantile(rows, QUANTILES, axis=0) for rows in kept.values()]) # (groups, quantiles, metrics)
+    write_baseline(grid, QUANTILES, {g: i for i, g in enumerate(kept)}, out_path,
+                   players={g: len(rows) for g, rows in kept.items()}, matches=read - skipped, minGames=min_games,
+                   builtAt=int(time.time()))
+    return {g: len(rows) for g, rows in kept.items()}
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("corpus", help="directory of match-v5 JSON files")
+    ap.add_argument("out", help="output .npy path, the index is written next to it as .json")
+    ap.add_argument("--workers", type=int, help="processes, defaults to every core")
+    ap.add_argument("--tiers", help="JSON file mapping puuid -> tier")
+    ap.add_argument("--min-games", type=int, default=3)
+    ap.add_argument("--min-players", type=int, default=30)
+    args = ap.parse_args()
+
+    tiers = json.loads(pathlib.Path(args.tiers).read_text(encoding="utf-8")) if args.tiers else None
+    start = time.perf_counter()
+    groups = build(args.corpus, args.out, args.workers, tiers, args.min_games, args.min_players)
+    print(f"Wrote {len(groups)} groups to {args.out} in {time.perf_counter() - start:.1f}s")
+    for group, count in groups.items():
+        print(f"{group:>24} {count:>8} players")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# summsync/core/cache.py
+import threading, time
+from core import trace
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+class LRUCache:
+    '''
+        LRUCache -> Small thread-safe in-process LRU, shared by the lambda's warm invocations
+        maxsize: int -> Entries kept before the least recently used one is evicted
+        ttl: float -> Optional seconds an entry stays fresh, expired entries count as misses
+    '''
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or (entry[0] is not None and entry[0] <= time.monotonic()):
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    '''
+        SingleFlight -> Collapses concurrent calls for the same key into one, the other callers wait and share its outcome
+        Nothing is kept after the call returns (pair it with a cache for that), exceptions are shared like results
+    '''
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        # Returns (result, shared), shared is True for callers that waited on someone else's call
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+class LayeredCache:
+    '''
+        LayeredCache -> In-process LRU in front of an optional shared store (e.g. DynamoDB), with hit/miss counters per layer
+        name: str -> Prefix of the cache.<name>.local|shared|miss trace counters
+        load: callable -> key -> value or None, reads the shared store (errors should be handled there and count as misses)
+        save: callable -> (key, value), writes the shared store
+        None values are never cached, so a failed or empty lookup is retried next time
+    '''
+    def __init__(self, name: str, maxsize: int = 256, ttl: Optional[float] = None,
+                 load: Optional[Callable[[Hashable], Any]] = None, save: Optional[Callable[[Hashable, Any], None]] = None):
+        self.name = name
+        self.local = LRUCache(maxsize, ttl)
+        self._load = load
+        self._save = save
+        self.shared_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        value = self.local.get(key)
+        if value is not None:
+            trace.incr(f"cache.{self.name}.local")
+            return value
+
+        if self._load is not None:
+            value = self._load(key)
+            if value is not None:
+                trace.incr(f"cache.{self.name}.shared")
+                with self._lock:
+                    self.shared_hits += 1
+                self.local.put(key, value)
+                return value
+
+        trace.incr(f"cache.{self.name}.miss")
+        with self._lock:
+            self.misses += 1
+        value = fetch()
+        if value is not None:
+            self.local.put(key, value)
+            if self._save is not None:
+                self._save(key, value)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self.local), "localHits": self.local.hits, "sharedHits": self.shared_hits, "misses": self.misses}
@@ -0,0 +1,104 @@
+# summsync/core/champions.py
+import os, sys, json, pickle, logging, pathlib, threading
+from importlib.resources import files as ir_files
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+CHAMPION_INDEX_PATH = os.environ.get("CHAMPION_INDEX_PATH") # Optional precompiled index, checked before anything else
+INDEX_FILENAME = "champion.idx.pickle"
+
+_INDEX: Optional[Dict[int, Dict[str, Any]]] = None # championId -> {"name", "title", "tags"}
+_SOURCE: Optional[str] = None
+_lock = threading.Lock()
+
+def _data_dirs() -> List[pathlib.Path]:
+    here = pathlib.Path(__file__).resolve()
+    return [
+        here.parent / "data",                  # same dir has /data
+        here.parent.parent / "data",           # one level up has /data
+        pathlib.Path("/var/task/data"),        # Lambda code root
+        pathlib.Path("/opt/data"),             # Lambda Layer path
+    ]
+
+def build_index(champions: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
+    # champion.json is keyed by champion name, Riot APIs hand us the numeric "key"
+    data = champions.get("data", champions)
+    return {
+        int(value["key"]): {"name": value["name"], "title": value.get("title"), "tags": list(value.get("tags") or [])}
+        for value in data.values()
+    }
+
+def _read_artifact(path: pathlib.Path) -> Dict[int, Dict[str, Any]]:
+    with path.open("rb") as f:
+        compact = pickle.load(f)
+    return {cid: {"name": name, "title": title, "tags": list(tags)} for cid, (name, title, tags) in compact.items()}
+
+def write_artifact(index: Dict[int, Dict[str, Any]], out_path) -> pathlib.Path:
+    '''
+        write_artifact -> Writes the index as a compact pickle of championId -> (name, title, tags)
+        Loading this on cold start skips parsing the full champion.json
+    '''
+    out_path = pathlib.Path(out_path)
+    compact = {cid: (c["name"], c["title"], tuple(c["tags"])) for cid, c in index.items()}
+    with out_path.open("wb") as f:
+        pickle.dump(compact, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return out_path
+
+def _load() -> Tuple[Dict[int, Dict[str, Any]], str]:
+    errors = []
+
+    # 1) Explicit artifact path
+    if CHAMPION_INDEX_PATH:
+        try:
+            return _read_artifact(pathlib.Path(CHAMPION_INDEX_PATH)), CHAMPION_INDEX_PATH
+        except Exception as e:
+            errors.append(f"{CHAMPION_INDEX_PATH}: {e}")
+
+    # 2) Package data: summsync/data/champion.json
+    try:
+        with ir_files("summsync.data").joinpath("champion.json").open("r", encoding="utf-8") as f:
+            return build_index(json.load(f)), "package summsync.data"
+    except Exception as e:
+        errors.append(f"package summsync.data: {e}")
+
+    # 3) Data dirs, preferring the precompiled artifact over the raw json in each one
+    for d in _data_dirs():
+        for name, reader in ((INDEX_FILENAME, _read_artifact),
+                             ("champion.json", lambda p: build_index(json.loads(p.read_text(encoding="utf-8"))))):
+            p = d / name
+            try:
+                if p.exists():
+                    return reader(p), str(p)
+            except Exception as e:
+                errors.append(f"{p}: {e}")
+
+    raise FileNotFoundError("champion.json not found. Tried:\n" + "\n".join(f"- {x}" for x in errors))
+
+def load_index() -> Dict[int, Dict[str, Any]]:
+    # Loaded once per process, the path that worked is kept in champion_source()
+    global _INDEX, _SOURCE
+    if _INDEX is None:
+        with _lock:
+            if _INDEX is None:
+                index, source = _load()
+                _INDEX, _SOURCE = index, source
+                logger.info("Loaded %d champions from %s", len(index), source)
+    return _INDEX
+
+def champion_source() -> Optional[str]:
+    return _SOURCE
+
+def get_champion(champ_id: int) -> Optional[Dict[str, Any]]:
+    return load_index().get(int(champ_id))
+
+def get_champions(champ_ids: Iterable[int]) -> List[Optional[Dict[str, Any]]]:
+    # Batch lookup, results keep the order of champ_ids (None for unknown ids)
+    index = load_index()
+    return [index.get(int(cid)) for cid in champ_ids]
+
+if __name__ == "__main__":
+    # python -m core.champions path/to/champion.json [out.pickle]
+    src = pathlib.Path(sys.argv[1])
+    out = pathlib.Path(sys.argv[2]) if len(sys.argv) > 2 else src.with_name(INDEX_FILENAME)
+    idx = build_index(json.loads(src.read_text(encoding="utf-8")))
+    print(f"Wrote {len(idx)} champions to {write_artifact(idx, out)}")
@@ -0,0 +1,50 @@
+# summsync/core/concurrency.py
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+from core.trace import bind
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+MATCH_FETCH_WORKERS  = int(os.environ.get("MATCH_FETCH_WORKERS", "10")) # Concurrent match-detail calls per player
+PLAYER_FETCH_WORKERS = int(os.environ.get("PLAYER_FETCH_WORKERS", "5")) # Players processed concurrently per create
+
+def map_concurrent(fn: Callable[[T], R], items: Iterable[T], max_workers: Optional[int] = None) -> List[R]:
+    '''
+        map_concurrent -> Runs fn over every item on a bounded thread pool
+        Results come back in the same order as items, and the first exception raised by fn is re-raised
+    '''
+    items = list(items)
+    if not items:
+        return []
+
+    workers = max(1, min(int(max_workers or MATCH_FETCH_WORKERS), len(items)))
+    if workers == 1: # No point paying for a pool
+        return [fn(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(bind(fn), items)) # bind: pool threads keep reporting to the request's trace
+
+def imap_concurrent(fn: Callable[[T], R], items: Iterable[T], max_workers: Optional[int] = None) -> Iterator[R]:
+    '''
+        imap_concurrent -> Streaming map_concurrent, yields results in input order as they become available
+        At most max_workers items are in flight or waiting to be consumed, and items is only read as needed,
+        so memory stays flat no matter how many items there are
+    '''
+    workers = max(1, int(max_workers or MATCH_FETCH_WORKERS))
+    if workers == 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    fn = bind(fn)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,97 @@
+# summsync/core/context.py
+import math
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+# (column code, stats key, decimals), in a fixed order so the prompt schema never shifts between calls
+CORE_COLUMNS = (
+    ("wr", "winRate", 2), ("kda", "kda", 2), ("kp", "kp", 2), ("cspm", "csPerMin", 1), ("gpm", "goldPerMin", 0),
+    ("vpm", "visionPerMin", 2), ("dmg", "damageDealt", 0),
+)
+EXTRA_COLUMNS = (
+    ("cs", "cs", 0), ("gold", "goldEarned", 0), ("bounty", "bountyGold", 0), ("alive", "longestAliveTime", 0),
+    ("vis", "visionScore", 1), ("wp", "wardsPlaced", 1), ("wk", "wardsKilled", 1), ("pink", "pinkWardsPlaced", 1),
+    ("fb", "firstBloods", 2), ("ft", "firstTowers", 2), ("obj", "objDamage", 0),
+)
+LEGEND = {
+    "wr": "win rate", "kda": "KDA", "kp": "kill participation", "cspm": "CS/min", "gpm": "gold/min",
+    "vpm": "vision/min", "dmg": "damage dealt", "cs": "CS", "gold": "gold earned", "bounty": "bounty gold",
+    "alive": "longest time alive (s)", "vis": "vision score", "wp": "wards placed", "wk": "wards killed",
+    "pink": "control wards", "fb": "first blood rate", "ft": "first tower rate", "obj": "objective damage",
+}
+
+# Progressively smaller layouts, every one keeps a full row per player:
+# (columns, mastery entries, mastery detail, tier/lane percentiles when the players carry them)
+LAYOUTS = (
+    (CORE_COLUMNS + EXTRA_COLUMNS, 5, True, True),
+    (CORE_COLUMNS + EXTRA_COLUMNS, 3, False, True),
+    (CORE_COLUMNS, 3, False, True),
+    (CORE_COLUMNS, 1, False, True),
+    (CORE_COLUMNS[:4], 0, False, False),
+)
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for this kind of text, close enough for budgeting
+    return math.ceil(len(text) / 4)
+
+def _num(value: Any, decimals: int) -> str:
+    if not isinstance(value, (int, float)):
+        return "-"
+    return str(int(round(value))) if decimals == 0 else f"{value:.{decimals}f}"
+
+def _rank(r: Optional[Dict[str, Any]]) -> str:
+    return f"{r.get('tier')} {r.get('rank')}" if r else "-"
+
+def _render(players: Sequence[Dict[str, Any]], columns, mastery_n: int, mastery_detail: bool, percentiles: bool) -> str:
+    codes = [c for c, _, _ in columns]
+    lines = [
+        "Per-game averages over recent Summoner's Rift games. Legend: " + ", ".join(f"{c}={LEGEND[c]}" for c in codes),
+        "|".join(["player", "solo", "flex", "role", "lane"] + codes),
+    ]
+    for p in players:
+        stats = p.get("stats") or {}
+        lines.append("|".join(
+            [f"{p.get('playerName')}#{p.get('gameTag')}", _rank(stats.get("rankedSolo")), _rank(stats.get("rankedFlex")),
+             str(stats.get("mostPlayedRole") or "-"), str(stats.get("mostPlayedLane") or "-")]
+            + [_num(stats.get(key), dec) for _, key, dec in columns]
+        ))
+
+    # Percentiles against a ranked baseline (core/baseline.py), so the model does not have to guess what is good for the tier
+    if percentiles and any(p.get("percentiles") for p in players):
+        lines.append("percentile vs same tier+lane players (0-100)")
+        for p in players:
+            pct = p.get("percentiles") or {}
+            lines.append("|".join([f"{p.get('playerName')}#{p.get('gameTag')}"] + [_num(pct.get(key), 0) for _, key, _ in columns]))
+
+    if mastery_n:
+        lines.append("mastery (champion:level:points" + (":roles" if mastery_detail else "") + ")")
+        for p in players:
+            champs = []
+            for m in (p.get("mastery") or [])[:mastery_n]:
+                entry = f"{m.get('championName')}:{m.get('championLevel')}:{m.get('championPoints')}"
+                if mastery_detail and m.get("roles"):
+                    entry += ":" + "/".join(m["roles"])
+                champs.append(entry)
+            lines.append(f"{p.get('playerName')}#{p.get('gameTag')}|" + (", ".join(champs) or "-"))
+    return "\n".join(lines)
+
+def build_context(players: Sequence[Dict[str, Any]], max_tokens: int) -> Tuple[str, int]:
+    '''
+        build_context -> Compact table of every player's stats (+ "percentiles" when present) + top mastery that fits in max_tokens
+        Detail is dropped for all players alike (extra columns, then mastery and percentiles) so nobody is cut mid-row
+        Returns (context text, layout level used), level 0 being the full layout
+    '''
+    text = ""
+    for level, (columns, mastery_n, detail, percentiles) in enumerate(LAYOUTS):
+        text = _render(players, columns, mastery_n, detail, percentiles)
+        if estimate_tokens(text) <= max_tokens:
+            return text, level
+
+    # Even the smallest layout is over budget: keep whole rows only, and say how many were left out
+    lines = text.split("\n")
+    kept = lines[:2]
+    for line in lines[2:]:
+        if estimate_tokens("\n".join(kept + [line])) + 10 > max_tokens:
+            break
+        kept.append(line)
+    omitted = len(lines) - len(kept)
+    return "\n".join(kept) + (f"\n(+{omitted} rows omitted for length)" if omitted else ""), len(LAYOUTS) - 1
@@ -0,0 +1,6 @@
+# summsync/core/keys.py
+# Kept free of imports: the session store needs it on routes that never load the Riot client
+
+def riot_id_key(name: str, tag: str) -> str:
+    # Riot IDs are case-insensitive, this is the one normalized form used for cache and session keys
+    return f"{str(name).strip().upper()}#{str(tag).strip().upper()}"
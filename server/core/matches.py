@@ -0,0 +1,49 @@
+# summsync/core/matches.py
+from typing import Any, Dict, Optional
+
+# The only participant fields Player / core.stats read, everything else in match-v5 is dropped
+PARTICIPANT_FIELDS = (
+    "puuid", "win", "lane", "role", "totalDamageDealt", "goldEarned", "longestTimeSpentLiving",
+    "visionScore", "wardsPlaced", "wardsKilled", "totalMinionsKilled", "firstBloodKill", "firstTowerKill",
+    "damageDealtToObjectives",
+)
+CHALLENGE_FIELDS = ("kda", "killParticipation", "goldPerMinute", "bountyGold", "visionScorePerMinute", "controlWardsPlaced")
+INFO_FIELDS = ("gameMode", "gameDuration", "gameEndTimestamp")
+
+def compact_participant(participant: Dict[str, Any]) -> Dict[str, Any]:
+    out = {k: participant[k] for k in PARTICIPANT_FIELDS if k in participant}
+    chal = participant.get("challenges") or {}
+    out["challenges"] = {k: chal[k] for k in CHALLENGE_FIELDS if k in chal}
+    return out
+
+def compact_match(match: Dict[str, Any]) -> Dict[str, Any]:
+    '''
+        compact_match -> Same shape as a match-v5 payload, trimmed to the fields the stats pipeline uses
+        Participants keep the metadata.participants order, so find_participant can index straight into them
+    '''
+    metadata = match.get("metadata") or {}
+    info = match.get("info") or {}
+    out_info = {k: info[k] for k in INFO_FIELDS if k in info}
+    out_info["participants"] = [compact_participant(p) for p in info.get("participants") or []]
+    return {
+        "metadata": {"matchId": metadata.get("matchId"), "participants": list(metadata.get("participants") or [])},
+        "info": out_info,
+    }
+
+def find_participant(match: Dict[str, Any], puuid: str) -> Optional[Dict[str, Any]]:
+    '''
+        find_participant -> The participant record for this PUUID, None when they are not in the match
+        Uses the metadata.participants index (same order as info.participants), PUUIDs survive renames unlike Riot IDs
+    '''
+    participants = match["info"]["participants"]
+    try:
+        idx = match["metadata"]["participants"].index(puuid)
+        if idx < len(participants) and participants[idx].get("puuid", puuid) == puuid:
+            return participants[idx]
+    except (KeyError, ValueError):
+        pass
+
+    for participant in participants: # Index and list out of step, fall back to a scan
+        if participant.get("puuid") == puuid:
+            return participant
+    return None
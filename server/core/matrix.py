@@ -0,0 +1,97 @@
+# summsync/core/matrix.py
+from typing import Any, Dict, List, Optional, Sequence
+from core.stats import METRICS
+
+try: # Optional, see core/baseline.py
+    import numpy as np
+except ImportError:
+    np = None
+
+_IDX = {name: i for i, name in enumerate(METRICS)}
+_WIN, _LOSE = _IDX["winRate"], _IDX["loseRate"]
+
+# Totals that scale with game length, per-minute rates are only meaningful for these
+RATE_METRICS = ("damageDealt", "goldEarned", "bountyGold", "visionScore", "wardsPlaced", "wardsKilled",
+                "pinkWardsPlaced", "cs", "objDamage")
+_RATE_COLS = [_IDX[name] for name in RATE_METRICS]
+
+class StatsMatrix:
+    '''
+        StatsMatrix -> Per-match rows of several players as one (players, matches, metrics) array
+        Players with fewer matches are NaN-padded, so every statistic is a single pass over the whole party
+        recent: list -> Per player, Player.recent rows ([gameEnd, gameDuration secs, *match_row, lane, role, gameMode], newest first)
+        depth: int -> Optional cap on matches per player (newest first), games that do not count are dropped after the cut
+    '''
+    def __init__(self, recent: Sequence[List[List[float]]], depth: Optional[int] = None):
+        if np is None:
+            raise RuntimeError("numpy is required for StatsMatrix")
+        rows = [[row for row in (list(r)[:depth] if depth else r) if len(row) > 2] for r in recent] # [gameEnd, duration] rows do not count
+        depth = max((len(r) for r in rows), default=0)
+
+        block = np.full((len(rows), depth, 2 + len(METRICS)), np.nan)
+        for i, r in enumerate(rows):
+            if r:
+                block[i, :len(r)] = np.asarray([row[:2 + len(METRICS)] for row in r], dtype=np.float64) # Numbers only
+        self.values = block[:, :, 2:]         # (players, matches, metrics)
+        self.minutes = block[:, :, 1] / 60.0  # (players, matches), real game length
+
+    @property
+    def games(self):
+        # Games with a win/loss result per player, the denominator StatsAggregator.averages uses
+        return np.nansum(self.values[:, :, _WIN] + self.values[:, :, _LOSE], axis=1)
+
+    def averages(self):
+        # (players, metrics) per-game averages, NaN for players without games
+        games = self.games
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(games[:, None] > 0, np.nansum(self.values, axis=1) / games[:, None], np.nan)
+
+    def variance(self):
+        # (players, metrics) population variance across each player's matches
+        with np.errstate(invalid="ignore", divide="ignore"):
+            counts = np.sum(~np.isnan(self.values), axis=1)
+            mean = np.nansum(self.values, axis=1) / counts
+            return np.where(counts > 0, np.nansum((self.values - mean[:, None, :]) ** 2, axis=1) / counts, np.nan)
+
+    def per_minute(self):
+        # (players, RATE_METRICS) totals over minutes played, so long games weigh in by their length
+        minutes = np.nansum(self.minutes, axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(minutes[:, None] > 0, np.nansum(self.values[:, :, _RATE_COLS], axis=1) / minutes[:, None], np.nan)
+
+    def party_percentiles(self, averages=None):
+        '''
+            party_percentiles -> (players, metrics) percentile rank of each player's average within the party, 0-100
+            Mid-rank: ties share the middle, NaN when fewer than two players have games
+        '''
+        avg = self.averages() if averages is None else averages
+        valid = ~np.isnan(avg)
+        below = np.sum(avg[:, None, :] > avg[None, :, :], axis=1)
+        equal = np.sum(avg[:, None, :] == avg[None, :, :], axis=1) - 1 # Minus the player itself
+        others = np.sum(valid, axis=0)[None, :] - 1
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(valid & (others > 0), (below + 0.5 * equal) / others * 100, np.nan)
+
+    def baseline_percentiles(self, tiers: Sequence[Optional[str]], lanes: Optional[Sequence[Optional[str]]] = None, averages=None):
+        '''
+            baseline_percentiles -> (players, metrics) percentile of each player's average within their tier/lane baseline, 0-100
+            Interpolated between the stored quantiles, NaN where no baseline is available (see core/baseline.py)
+        '''
+        from core.baseline import quantile_grid, percentile_of
+        avg = self.averages() if averages is None else averages
+        out = np.full(avg.shape, np.nan)
+        groups = list(zip(tiers, lanes or [None] * len(tiers)))
+
+        # One pass per distinct tier/lane, all of its players at once
+        for group in dict.fromkeys(groups):
+            found = quantile_grid(*group)
+            if found is None:
+                continue
+            levels, grid = found
+            rows = np.array([g == group for g in groups])
+            out[rows] = percentile_of(avg[rows], levels * 100, np.asarray(grid, dtype=np.float64))
+        return out
+
+def to_records(array, names: Sequence[str], ndigits: int = 3) -> List[Dict[str, Any]]:
+    # (players, len(names)) array -> one {name: value} dict per player, NaN becomes None for JSON
+    return [{name: (None if v != v else round(float(v), ndigits)) for name, v in zip(names, row)} for row in array.tolist()]
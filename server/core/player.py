@@ -1,146 +1,164 @@
 import os
 import json
-from core.utils import get_puuid, get_champion_name, get_match, find_player, get_player_rank
-import urllib.request
+import logging
+from core.utils import get_puuid, iter_matches, get_player_rank
+from core.matches import find_participant
+from core.champions import get_champions
+from core.stats import METRICS, StatsAggregator, is_counted, match_row
+from core.riot import riot, AMERICAS, NA1
+from core import trace
+
+logger = logging.getLogger(__name__)
+
+MATCH_COUNT     = int(os.environ.get("MATCH_COUNT", "20"))      # Default history depth
+MAX_MATCH_COUNT = int(os.environ.get("MAX_MATCH_COUNT", "200")) # Upper bound a request can ask for
+IDS_PAGE_SIZE   = 100 # Most match IDs match-v5 returns per call
+STATE_VERSION   = 2   # Bumped when the layout of recent changes, older states are refetched once
+
+def _window_stats(rows):
+    # Aggregate of stored rows ([gameEnd, duration, *match_row, lane, role, gameMode]), uncounted [gameEnd, duration] rows are skipped
+    agg = StatsAggregator()
+    width = 2 + len(METRICS)
+    for row in rows:
+        if len(row) > 2:
+            agg.add_row(row[2:width], *row[width:])
+    return agg
 
 class Player:
-    def __init__(self, player_name, game_tag):
+    def __init__(self, player_name, game_tag, puuid=None):
         self._player_name = player_name
         self._game_tag = game_tag
 
-        # GET PUUID
-        # Response returns two keys, status_code and body containing the puuid
-        self.puuid = get_puuid(player_name, game_tag)
+        # GET PUUID (skipped when the caller already resolved it)
+        # None when no account matches the Riot ID
+        self.puuid = puuid or get_puuid(player_name, game_tag)
 
-        # Important Stats
-        self.kills = 0
-        self.assits = 0
-        self.deaths = 0
-        self.kda = 0
-        self.kp = 0
-        self.avg_dmg = 0
-        self.dmg_min = 0 # Damage per min
-        self.gold = 0 # Average gold per Game
-        self.gold_min = 0 # Gold per min
-        self.bounty_gold = 0 # Average Bounty Gold per Game
-        self.cs = 0 # Average Farming
-        self.cs_min = 0 # CS per min
-        self.vision_score = 0 # Average Vision Score by Game
-        self.vision_min = 0 # Vision Score per min
-        self.wards_place = 0 # Average Wards Placed
-        self.wards_kill = 0 # Average Wards Killed
-        self.pink_wards = 0 # Average Pink Wards Placed
-        self.obj_dmg = 0 # Average Objective Damage by Game
-        self.wins = 0 # Average Win Rate
-        self.loses = 0 # Average Loss Rate
-        self.longest_living_time = 0  # Average Time Spent Alive
-        self.first_bloods = 0 # Average Number of First Bloods
-        self.first_towers = 0 # Average Number of First Towers
+        # Totals of the counted matches among the latest match_count (a sliding window over recent), see core/stats.py
+        self.stats = StatsAggregator()
 
-        self.lanes = {"TOP": 0, "JUNGLE": 0, "MID": 0, "BOTTOM": 0, "SUPPORT": 0, "NONE": 0}
-        self.roles = {}
-        self.gamemodes = {}
-        self.multi_kills = {"doubleKills": 0, "tripleKills": 0, "quadraKills": 0, "pentaKills": 0}
+        # Newest match already in recent, lets a refresh ask Riot only for newer games
+        self.last_match_id = None
+        self.last_game_end = None # Epoch ms
 
-    def matchHistory(self):
-        '''
-            matchHistory -> Will fetch Match History from Riot API data and manipualte the most improtant details
-        '''
-        num_history = 20
-        history_id_url = f"https://americas.api.riotgames.com/lol/match/v5/matches/by-puuid/{self.puuid}/ids?start=0&count={num_history}&api_key={os.environ.get("RIOT_API_KEY")}"
-        history_ids = None
+        # How many of the latest match IDs the stored state covers, a deeper request starts over from a full fetch
+        self.depth = 0
 
-        try:
-            with urllib.request.urlopen(history_id_url) as response:
-                '''
-                    EXAMPLE RESPONSE FOR NUM_HISTORY:
-                    [
-                        "NA1_5370142317",
-                        "NA1_5370138029",
-                        "NA1_5370133124",
-                        ...
-                    ]
-                '''
-                history_ids = json.loads(response.read().decode())
-        except Exception as e:
-            print(f"Error making API call: {e}")
-            return {
-                'statusCode': 500,
-                'body': json.dumps(f"Error: {str(e)}")
-            }
-        
-        for history_id in history_ids:
-            match_info = get_match(history_id)
+        # One row per fetched match ID, newest first, so the window is cut by match count like a fresh fetch:
+        # [gameEndTimestamp, gameDuration secs, *match_row, lane, role, gameMode], or just [gameEndTimestamp, gameDuration secs]
+        # for a game that does not count (not CLASSIC, or a remake)
+        # stats and the multi-player stats matrix (core/matrix.py) are computed from it, capped at MAX_MATCH_COUNT
+        self.recent = []
+        self._caught_up = False # Set by _history_ids: the fetch reached the stored matches (no gap before recent)
 
-            if match_info['info']['gameMode'] != "CLASSIC":
-                continue
+    @property
+    def wins(self):
+        return self.stats.wins
 
-            if match_info['info']['gameDuration'] < 240: # Game is a Remake
-                continue
-
-            print(f"Match ID: {history_id}")
-
-            player = find_player(match_info['info']['participants'], self._player_name, self._game_tag)
-            chal = player['challenges']
-            game_time = match_info['info']['gameDuration']
-
-            # Formatted TIme
-            minutes = game_time // 100
-            seconds = game_time % 100
-
-            # CS / Farming
-            self.cs += player.get('totalMinionsKilled', 0)
-            self.cs_min += player.get('totalMinionsKilled', 0) / minutes
+    @property
+    def loses(self):
+        return self.stats.loses
 
-            # Vision
-            self.vision_score += player.get('visionScore', 0)
-            self.vision_min   += chal.get('visionScorePerMinute', 0)
-            self.wards_place  += player.get('wardsPlaced', 0)
-            self.wards_kill   += player.get('wardsKilled', 0)
-            self.pink_wards   += chal.get('controlWardsPlaced', 0)
-
-            self.longest_living_time += player.get('longestTimeSpentLiving', 0)
-
-            # Gold
-            self.gold        += player.get('goldEarned', 0)
-            self.gold_min    += chal.get('goldPerMinute', 0)
-            self.bounty_gold += chal.get('bountyGold', 0)
-
-            # Firsts
-            self.first_bloods += 1 if player.get('firstBloodKill') else 0
-            self.first_towers += 1 if player.get('firstTowerKill') else 0
-            self.obj_dmg      += player.get('damageDealtToObjectives', 0)
-            self.avg_dmg      += player.get('totalDamageDealt', 0)
-
-            # KDA / KP
-            self.kills  += player.get('kills', 0)
-            self.assits += player.get('assists', 0)
-            self.deaths += player.get('deaths', 0)
-            self.kda    += chal.get('kda', 0)
-            self.kp     += chal.get('killParticipation', 0)
+    def load_state(self, state):
+        '''
+            load_state -> Resumes from a state saved by export_state, so matchHistory only fetches newer games
+            state: dict -> {"version", "lastMatchId", "lastGameEnd", "depth", "recent"} or None to start fresh
+        '''
+        if not state or state.get("version") != STATE_VERSION: # Older layouts are refetched once
+            return
+        self.last_match_id = state.get("lastMatchId")
+        self.last_game_end = state.get("lastGameEnd")
+        self.depth = int(state.get("depth") or 0)
+        self.recent = list(state.get("recent") or [])
+        self.stats = _window_stats(self.recent[:self.depth])
+
+    def export_state(self):
+        return {"version": STATE_VERSION, "lastMatchId": self.last_match_id, "lastGameEnd": self.last_game_end,
+                "depth": self.depth, "recent": self.recent[:MAX_MATCH_COUNT]}
+
+    def _history_ids(self, num_history, seen_id=None):
+        '''
+            _history_ids -> Yields up to num_history match IDs (newest first), paging through Riot 100 at a time
+            Stops at seen_id, since that match and everything older is already in recent
+        '''
+        self._caught_up = False
+        start = 0
+        while start < num_history:
+            count = min(IDS_PAGE_SIZE, num_history - start)
+            params = {"start": start, "count": count}
+            if self.last_game_end:
+                params["startTime"] = int(self.last_game_end // 1000) # Riot filters by game start, in epoch seconds
+
+            page = riot.get(AMERICAS, f"/lol/match/v5/matches/by-puuid/{self.puuid}/ids",
+                            params, method="match-v5.ids")
+            '''
+                EXAMPLE RESPONSE FOR NUM_HISTORY:
+                [
+                    "NA1_5370142317",
+                    "NA1_5370138029",
+                    "NA1_5370133124",
+                    ...
+                ]
+            '''
+            for history_id in page:
+                if history_id == seen_id:
+                    self._caught_up = True
+                    return
+                yield history_id
+
+            if len(page) < count: # No older matches left (or, with startTime, no newer ones were missed)
+                self._caught_up = True
+                return
+            start += count
+
+    def matchHistory(self, max_workers=None, match_count=MATCH_COUNT):
+        '''
+            matchHistory -> Will fetch Match History from Riot API data and manipualte the most improtant details
+            When a state was loaded, only matches played after the last processed one are fetched
+            stats always cover the counted games among the latest match_count matches, older rows drop out of the window
+            max_workers: int -> Max concurrent match-detail calls (defaults to MATCH_FETCH_WORKERS)
+            match_count: int -> How many of the latest matches to look at (capped at MAX_MATCH_COUNT)
+        '''
+        num_history = max(1, min(int(match_count), MAX_MATCH_COUNT))
+        if num_history > self.depth: # The state never looked this far back, older games have to be fetched too
+            self.recent = []
+            self.last_match_id = self.last_game_end = None
+        seen_id = self.last_match_id
+        newest_id, newest_end = self.last_match_id, self.last_game_end
+        fresh = []
+
+        # Matches stream in as they are fetched (in order), only the participant's row is kept from each one
+        for history_id, match_info in iter_matches(self._history_ids(num_history, seen_id), max_workers):
+            info = match_info['info']
+            game_end = info.get('gameEndTimestamp') or 0
+            if newest_end is None or game_end > newest_end:
+                newest_id, newest_end = history_id, game_end
+
+            if not is_counted(info): # Not CLASSIC, or a remake, kept without stats so the window still counts it
+                fresh.append([game_end, info.get('gameDuration', 0)])
+                continue
 
-            # Win / Lose
-            if player.get('win') is True:
-                self.wins += 1
-            elif player.get('win') is False:
-                self.loses += 1
+            logger.debug("Match ID: %s", history_id)
+            trace.incr("matches.counted")
 
-            # Lane / Role / Gamemode
-            lane     = player.get('lane', 'NONE')
-            role     = player.get('role', 'UNKNOWN')
-            gamemode = match_info['info'].get('gameMode', 'UNKNOWN')
+            player = find_participant(match_info, self.puuid) # By PUUID, so renamed players are still found
+            if player is None:
+                raise LookupError(f"Player {self.puuid} is not a participant of {history_id}")
+            fresh.append([game_end, info.get('gameDuration', 0), *match_row(player, info),
+                          player.get('lane', 'NONE'), player.get('role', 'UNKNOWN'), info.get('gameMode', 'UNKNOWN')])
 
-            self.lanes[lane]        = self.lanes.get(lane, 0) + 1
-            self.roles[role]        = self.roles.get(role, 0) + 1
-            self.gamemodes[gamemode]= self.gamemodes.get(gamemode, 0) + 1
+        if self.recent and not self._caught_up:
+            # More new games than one fetch reaches: the stored rows are no longer the ones right before them
+            self.recent, self.depth = [], 0
+        self.recent = (fresh + self.recent)[:MAX_MATCH_COUNT]
+        self.stats = _window_stats(self.recent[:num_history])
+        self.last_match_id, self.last_game_end = newest_id, newest_end
+        self.depth = max(self.depth, num_history)
 
     def returnPlayerStats(self):
         # Compile and Organize Player Data
-        totalGames = self.wins + self.loses
-
         player_ranks = get_player_rank(self.puuid)
 
-        rank_solo = ranked_flex = None
+        ranked_solo = ranked_flex = None
 
         for rank in player_ranks:
             if rank['queueType'] == 'RANKED_SOLO_5x5':
@@ -149,38 +167,7 @@ class Player:
             if rank['queueType'] == 'RANKED_FLEX_SR':
                 ranked_flex = {"tier": rank['tier'], "rank": rank['rank'], "wins": rank['wins'], "losses": rank['losses']}
 
-        player = {
-            "kda": self.kda,
-            "kp": self.kp,
-            "damageDealt": self.avg_dmg,
-            "goldEarned": self.gold,
-            "goldPerMin": self.gold_min,
-            "bountyGold": self.bounty_gold,
-            "winRate": self.wins,
-            "loseRate": self.loses,
-            "longestAliveTime": self.longest_living_time,
-            "visionScore": self.vision_score,
-            "visionPerMin": self.vision_min,
-            "wardsPlaced": self.wards_place,
-            "wardsKilled": self.wards_kill,
-            "pinkWardsPlaced": self.pink_wards,
-            "cs": self.cs,
-            "csPerMin": self.cs_min,
-            "firstBloods": self.first_bloods,
-            "firstTowers": self.first_towers,
-            "objDamage": self.obj_dmg
-        }
-
-        for key in player:
-            player[key] /= totalGames
-
-        max_role =  max(self.roles, key=self.roles.get)
-        max_lane =  max(self.lanes, key=self.lanes.get)
-        max_gamemode =  max(self.gamemodes, key=self.gamemodes.get)
-
-        player['mostPlayedRole'] = max_role
-        player['mostPlayedLane'] = max_lane
-        player['mostPlayedGamemode'] = max_gamemode
+        player = self.stats.summary() # Per-game averages + most played role/lane/gamemode
         player['rankedSolo'] = ranked_solo
         player['rankedFlex'] = ranked_flex
 
@@ -195,82 +182,75 @@ class Player:
             raise TypeError(f"We got the wrong type for n. It must be an integer number. Instead got {type(n)})")
         
         
-        url = f"https://na1.api.riotgames.com/lol/champion-mastery/v4/champion-masteries/by-puuid/{self.puuid}/top?count={n}&api_key={os.environ.get("RIOT_API_KEY")}"
-
         try:
-            with urllib.request.urlopen(url) as response:
-                data = json.loads(response.read().decode())
-                '''
-
-                EXAMPLE RESPONSE USING N = 3:
-                [
-                    {
-                        "puuid": {PUUID},
-                        "championId": 92,
-                        "championLevel": 47,
-                        "championPoints": 490290,
-                        "lastPlayTime": 1757237563000,
-                        "championPointsSinceLastLevel": 7690,
-                        "championPointsUntilNextLevel": 3310,
-                        "markRequiredForNextLevel": 2,
-                        "tokensEarned": 4,
-                        "championSeasonMilestone": 0,
-                        "nextSeasonMilestone": {
-                            "requireGradeCounts": {
-                                "A-": 1
-                            },
-                            "rewardMarks": 1,
-                            "bonus": false,
-                            "totalGamesRequires": 1
-                        }
-                    },
-                    {
-                        "puuid": {PUUID},
-                        "championId": 141,
-                        "championLevel": 16,
-                        "championPoints": 160147,
-                        "lastPlayTime": 1756285211000,
-                        "championPointsSinceLastLevel": 18547,
-                        "championPointsUntilNextLevel": -7547,
-                        "markRequiredForNextLevel": 2,
-                        "tokensEarned": 0,
-                        "championSeasonMilestone": 0,
-                        "nextSeasonMilestone": {
-                            "requireGradeCounts": {
-                                "A-": 1
-                            },
-                            "rewardMarks": 1,
-                            "bonus": false,
-                            "totalGamesRequires": 1
-                        }
-                    },
-                    ...
-                ]
-                '''
+            data = riot.get(NA1, f"/lol/champion-mastery/v4/champion-masteries/by-puuid/{self.puuid}/top",
+                            {"count": n}, method="champion-mastery-v4.top")
+            '''
+
+            EXAMPLE RESPONSE USING N = 3:
+            [
+                {
+                    "puuid": {PUUID},
+                    "championId": 92,
+                    "championLevel": 47,
+                    "championPoints": 490290,
+                    "lastPlayTime": 1757237563000,
+                    "championPointsSinceLastLevel": 7690,
+                    "championPointsUntilNextLevel": 3310,
+                    "markRequiredForNextLevel": 2,
+                    "tokensEarned": 4,
+                    "championSeasonMilestone": 0,
+                    "nextSeasonMilestone": {
+                        "requireGradeCounts": {
+                            "A-": 1
+                        },
+                        "rewardMarks": 1,
+                        "bonus": false,
+                        "totalGamesRequires": 1
+                    }
+                },
+                {
+                    "puuid": {PUUID},
+                    "championId": 141,
+                    "championLevel": 16,
+                    "championPoints": 160147,
+                    "lastPlayTime": 1756285211000,
+                    "championPointsSinceLastLevel": 18547,
+                    "championPointsUntilNextLevel": -7547,
+                    "markRequiredForNextLevel": 2,
+                    "tokensEarned": 0,
+                    "championSeasonMilestone": 0,
+                    "nextSeasonMilestone": {
+                        "requireGradeCounts": {
+                            "A-": 1
+                        },
+                        "rewardMarks": 1,
+                        "bonus": false,
+                        "totalGamesRequires": 1
+                    }
+                },
+                ...
+            ]
+            '''
             res = []
-            champ_ids = []
-
-            for champ in data:
-                champ_ids.append(champ['championId'])
-            
-            for i, champ_id in enumerate(champ_ids):
-                champ_info = get_champion_name(champ_id)
+            champ_infos = get_champions([champ['championId'] for champ in data]) # One index pass for every mastery entry
 
+            for champ, champ_info in zip(data, champ_infos):
                 champ_obj = {}
-                champ_obj['championLevel'] = data[i]['championLevel']
-                champ_obj['championPoints'] = data[i]['championPoints']
+                champ_obj['championLevel'] = champ['championLevel']
+                champ_obj['championPoints'] = champ['championPoints']
                 champ_obj['championName'] = champ_info['name']
                 champ_obj['roles'] = champ_info['tags']
                 champ_obj['title'] = champ_info['title']
 
                 res.append(champ_obj) # Sorted by Top Mastery -> Least Top Mastery
-            print("Successfully created TopMasteries")
+            logger.debug("Top %d masteries for %s", len(res), self.puuid)
             return {
                 'statusCode': 200,
                 'body': json.dumps(res)
             }
         except Exception as e:
-            print(f"Error making API call: {e}")
+            logger.warning("Mastery call failed for %s: %s", self.puuid, e)
             return {
                 'statusCode': 500,
                 'body': json.dumps(f"Error: {str(e)}")
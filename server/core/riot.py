@@ -0,0 +1,232 @@
+# summsync/core/riot.py
+import os, json, time, random, queue, socket, logging, threading, http.client
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode, urlsplit
+from core import trace
+
+logger = logging.getLogger(__name__)
+AMERICAS = "americas.api.riotgames.com" # Regional routing (account-v1, match-v5)
+NA1      = "na1.api.riotgames.com"      # Platform routing (league-v4, champion-mastery-v4)
+
+RIOT_APP_RATE_LIMIT    = os.environ.get("RIOT_APP_RATE_LIMIT", "20:1,100:120") # Used until Riot tells us the real limits
+RIOT_MAX_RETRIES       = int(os.environ.get("RIOT_MAX_RETRIES", "3"))
+RIOT_BACKOFF_BASE_SECS = float(os.environ.get("RIOT_BACKOFF_BASE_SECS", "0.5"))
+RIOT_TIMEOUT_SECS      = float(os.environ.get("RIOT_TIMEOUT_SECS", "10"))
+RIOT_POOL_SIZE         = int(os.environ.get("RIOT_POOL_SIZE", "10")) # Idle keep-alive connections kept per host
+RIOT_BASE_URL          = os.environ.get("RIOT_BASE_URL", "") # Sends every routing host to one server instead, e.g. http://127.0.0.1:8765 (bench stand-in)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class RiotAPIError(Exception):
+    '''
+        RiotAPIError -> Raised when Riot answers with a non-2xx status (after retries) or cannot be reached
+        status: int -> HTTP status, 0 when the request never got a response
+    '''
+    def __init__(self, status: int, path: str, message: str = ""):
+        super().__init__(f"Riot API {status} for {path}: {message}".strip())
+        self.status = status
+        self.path = path
+
+class _TokenBucket:
+    def __init__(self, capacity: int, window: float):
+        self.capacity = capacity
+        self.window = window
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        rate = self.capacity / self.window
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float: # Seconds until one token is available
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.window / self.capacity
+
+class RateLimiter:
+    '''
+        RateLimiter -> Set of token buckets for one Riot limit scope (app per host, or one method per host)
+        spec: str -> Riot's limit format "count:seconds,count:seconds", e.g. "20:1,100:120"
+    '''
+    def __init__(self, spec: Optional[str] = None):
+        self._buckets: Dict[float, _TokenBucket] = {}
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        if spec:
+            self.update(spec)
+
+    @staticmethod
+    def _parse(spec: str):
+        out = []
+        for part in (spec or "").split(","):
+            count, _, window = part.strip().partition(":")
+            if count and window:
+                out.append((int(count), float(window)))
+        return out
+
+    def update(self, spec: str, counts: Optional[str] = None):
+        # Follow the limits Riot reports, and sync our tokens with the counts it has already seen
+        limits = self._parse(spec)
+        used = {window: count for count, window in self._parse(counts)} if counts else {}
+        with self._lock:
+            now = time.monotonic()
+            for capacity, window in limits:
+                bucket = self._buckets.get(window)
+                if bucket is None or bucket.capacity != capacity:
+                    bucket = self._buckets[window] = _TokenBucket(capacity, window)
+                bucket._refill(now)
+                if window in used:
+                    bucket.tokens = min(bucket.tokens, max(0.0, capacity - used[window]))
+            windows = {window for _, window in limits}
+            for window in list(self._buckets):
+                if window not in windows: # Riot dropped this window
+                    del self._buckets[window]
+
+    def block_for(self, seconds: float):
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def acquire(self):
+        # Blocks until every bucket has a token, then takes one from each
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = max([self._blocked_until - now] + [b.wait_time(now) for b in self._buckets.values()])
+                if wait <= 0:
+                    for b in self._buckets.values():
+                        b.tokens -= 1
+                    return
+            time.sleep(wait)
+
+class _ConnectionPool:
+    # Keep-alive HTTPS connections for one host, each connection is used by one thread at a time
+    def __init__(self, host: str, size: int):
+        self.host = host
+        self._idle = queue.LifoQueue(maxsize=size)
+        base = urlsplit(RIOT_BASE_URL) if RIOT_BASE_URL else None
+        self._address = base.netloc if base else host
+        self._conn_cls = http.client.HTTPConnection if base and base.scheme == "http" else http.client.HTTPSConnection
+
+    def get(self) -> http.client.HTTPConnection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._conn_cls(self._address, timeout=RIOT_TIMEOUT_SECS)
+
+    def put(self, conn: http.client.HTTPConnection):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+class RiotClient:
+    '''
+        RiotClient -> Shared Riot API client
+        Pools keep-alive connections per routing host, waits on app + method rate limits, and retries 429/5xx with jittered backoff
+    '''
+    def __init__(self, api_key: Optional[str] = None):
+        self._api_key = api_key
+        self._pools: Dict[str, _ConnectionPool] = {}
+        self._app_limits: Dict[str, RateLimiter] = {}
+        self._method_limits: Dict[tuple, RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, host: str) -> _ConnectionPool:
+        with self._lock:
+            if host not in self._pools:
+                self._pools[host] = _ConnectionPool(host, RIOT_POOL_SIZE)
+            return self._pools[host]
+
+    def _limiters(self, host: str, method: str):
+        with self._lock:
+            app = self._app_limits.get(host)
+            if app is None:
+                app = self._app_limits[host] = RateLimiter(RIOT_APP_RATE_LIMIT)
+            meth = self._method_limits.get((host, method))
+            if meth is None:
+                meth = self._method_limits[(host, method)] = RateLimiter()
+            return app, meth
+
+    def _send(self, host: str, url: str):
+        pool = self._pool(host)
+        conn = pool.get()
+        try:
+            conn.request("GET", url, headers={
+                "X-Riot-Token": self._api_key or os.environ.get("RIOT_API_KEY") or "",
+                "Accept": "application/json",
+            })
+            resp = conn.getresponse()
+            body = resp.read()
+        except Exception:
+            conn.close() # Broken keep-alive connection, never hand it back
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            pool.put(conn)
+        return resp.status, resp.headers, body
+
+    def get(self, host: str, path: str, params: Optional[Dict[str, Any]] = None, method: Optional[str] = None) -> Any:
+        '''
+            get -> GETs a Riot endpoint and returns the decoded JSON
+            host: str -> Routing host (AMERICAS or NA1)
+            path: str -> Already-quoted path, e.g. /lol/match/v5/matches/NA1_123
+            method: str -> Name of the Riot method, used to track its own rate limit (defaults to path)
+        '''
+        url = path + ("?" + urlencode(params) if params else "")
+        app_limit, method_limit = self._limiters(host, method or path)
+        with trace.span(f"riot.{method or 'other'}"): # Includes rate-limit waits and retries
+            return self._get(host, path, url, app_limit, method_limit)
+
+    def _get(self, host: str, path: str, url: str, app_limit: RateLimiter, method_limit: RateLimiter) -> Any:
+        attempt = 0
+        while True:
+            with trace.span("riot.rateLimitWait"):
+                app_limit.acquire()
+                method_limit.acquire()
+
+            trace.incr("riot.calls")
+            try:
+                status, headers, body = self._send(host, url)
+            except (OSError, http.client.HTTPException, socket.timeout) as e:
+                if attempt >= RIOT_MAX_RETRIES:
+                    raise RiotAPIError(0, path, str(e)) from e
+                trace.incr("riot.retries")
+                attempt += 1
+                time.sleep(self._backoff(attempt))
+                continue
+
+            if headers.get("X-App-Rate-Limit"):
+                app_limit.update(headers["X-App-Rate-Limit"], headers.get("X-App-Rate-Limit-Count"))
+            if headers.get("X-Method-Rate-Limit"):
+                method_limit.update(headers["X-Method-Rate-Limit"], headers.get("X-Method-Rate-Limit-Count"))
+
+            if 200 <= status < 300:
+                return json.loads(body.decode("utf-8")) if body else None
+
+            if status in RETRY_STATUSES and attempt < RIOT_MAX_RETRIES:
+                trace.incr("riot.retries")
+                trace.incr(f"riot.status{status}")
+                attempt += 1
+                delay = self._backoff(attempt)
+                if status == 429 and headers.get("Retry-After"):
+                    delay = max(delay, float(headers["Retry-After"]))
+                    # Service limits (no X-Rate-Limit-Type) only affect this call, app/method limits affect everyone on the scope
+                    limit_type = (headers.get("X-Rate-Limit-Type") or "").lower()
+                    if limit_type == "application":
+                        app_limit.block_for(delay)
+                    elif limit_type == "method":
+                        method_limit.block_for(delay)
+                logger.warning("Riot %s on %s, retry %d in %.2fs", status, path, attempt, delay)
+                time.sleep(delay)
+                continue
+
+            raise RiotAPIError(status, path, body.decode("utf-8", "replace")[:200])
+
+    @staticmethod
+    def _backoff(attempt: int) -> float: # Full jitter exponential backoff
+        return random.uniform(0, RIOT_BACKOFF_BASE_SECS * (2 ** (attempt - 1)))
+
+riot = RiotClient() # Module-level client so warm lambdas keep their connections and limiter state
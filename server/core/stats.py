@@ -0,0 +1,97 @@
+# summsync/core/stats.py
+from array import array
+from typing import Any, Dict, Iterable, Tuple
+
+# Output keys of returnPlayerStats, in the order they are stored in a row / the sums array
+METRICS = (
+    "kda", "kp", "damageDealt", "goldEarned", "goldPerMin", "bountyGold", "winRate", "loseRate",
+    "longestAliveTime", "visionScore", "visionPerMin", "wardsPlaced", "wardsKilled", "pinkWardsPlaced",
+    "cs", "csPerMin", "firstBloods", "firstTowers", "objDamage",
+)
+_IDX = {name: i for i, name in enumerate(METRICS)}
+_WIN, _LOSE = _IDX["winRate"], _IDX["loseRate"]
+
+DEFAULT_LANES = ("TOP", "JUNGLE", "MID", "BOTTOM", "SUPPORT", "NONE")
+
+def is_counted(info: Dict[str, Any]) -> bool:
+    # Only Summoner's Rift games that were not remakes count toward stats
+    return info.get('gameMode') == "CLASSIC" and info.get('gameDuration', 0) >= 240
+
+def match_row(player: Dict[str, Any], info: Dict[str, Any]) -> Tuple[float, ...]:
+    '''
+        match_row -> Turns one participant record into its metric values, ordered like METRICS
+        player: dict -> match-v5 participant
+        info: dict -> match-v5 "info" block the participant came from
+    '''
+    chal = player.get('challenges') or {}
+    game_time = info['gameDuration']
+
+    # Formatted TIme
+    minutes = game_time // 100
+
+    win = player.get('win')
+    return (
+        chal.get('kda', 0),
+        chal.get('killParticipation', 0),
+        player.get('totalDamageDealt', 0),
+        player.get('goldEarned', 0),
+        chal.get('goldPerMinute', 0),
+        chal.get('bountyGold', 0),
+        1 if win is True else 0,
+        1 if win is False else 0,
+        player.get('longestTimeSpentLiving', 0),
+        player.get('visionScore', 0),
+        chal.get('visionScorePerMinute', 0),
+        player.get('wardsPlaced', 0),
+        player.get('wardsKilled', 0),
+        chal.get('controlWardsPlaced', 0),
+        player.get('totalMinionsKilled', 0),
+        player.get('totalMinionsKilled', 0) / minutes,
+        1 if player.get('firstBloodKill') else 0,
+        1 if player.get('firstTowerKill') else 0,
+        player.get('damageDealtToObjectives', 0),
+    )
+
+class StatsAggregator:
+    '''
+        StatsAggregator -> Running totals for a player's matches, folded in one stored row at a time
+    '''
+    __slots__ = ("sums", "lanes", "roles", "gamemodes")
+
+    def __init__(self):
+        self.sums = array('d', bytes(8 * len(METRICS)))
+        self.lanes = dict.fromkeys(DEFAULT_LANES, 0)
+        self.roles = {}
+        self.gamemodes = {}
+
+    @property
+    def wins(self) -> int:
+        return int(self.sums[_WIN])
+
+    @property
+    def loses(self) -> int:
+        return int(self.sums[_LOSE])
+
+    @property
+    def games(self) -> int: # Games with a win/loss result, the denominator of every average
+        return self.wins + self.loses
+
+    def add_row(self, row: Iterable[float], lane: str = 'NONE', role: str = 'UNKNOWN', gamemode: str = 'UNKNOWN'):
+        sums = self.sums
+        for i, value in enumerate(row):
+            sums[i] += value
+        self.lanes[lane]         = self.lanes.get(lane, 0) + 1
+        self.roles[role]         = self.roles.get(role, 0) + 1
+        self.gamemodes[gamemode] = self.gamemodes.get(gamemode, 0) + 1
+
+    def averages(self) -> Dict[str, float]:
+        # Per-game averages, all zeros when no game has been counted yet
+        total = self.games
+        return {name: (self.sums[i] / total if total else 0.0) for i, name in enumerate(METRICS)}
+
+    def summary(self) -> Dict[str, Any]:
+        out = self.averages()
+        out['mostPlayedRole'] = max(self.roles, key=self.roles.get) if self.roles else None
+        out['mostPlayedLane'] = max(self.lanes, key=self.lanes.get) if self.lanes else None
+        out['mostPlayedGamemode'] = max(self.gamemodes, key=self.gamemodes.get) if self.gamemodes else None
+        return out
@@ -0,0 +1,115 @@
+# summsync/core/trace.py
+import os, json, time, uuid, threading, contextlib, contextvars
+from typing import Any, Callable, Dict, Iterator, Optional
+
+TRACE_FORMAT    = os.environ.get("TRACE_FORMAT", "json").lower() # json | emf (CloudWatch Embedded Metric Format) | off
+TRACE_NAMESPACE = os.environ.get("TRACE_NAMESPACE", "Summsync")  # EMF metric namespace
+
+_current: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("summsync_trace", default=None)
+
+class Trace:
+    '''
+        Trace -> Timings and counters of one request, shared by every thread working on it
+        Spans are aggregated per name (count, total, max) so a 200-match history stays one line in the summary
+    '''
+    def __init__(self, name: str, request_id: Optional[str] = None, **attrs):
+        self.name = name
+        self.request_id = request_id or uuid.uuid4().hex
+        self.attrs = dict(attrs)
+        self.started = time.perf_counter()
+        self.spans: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, ms: float):
+        with self._lock:
+            s = self.spans.get(name)
+            if s is None:
+                s = self.spans[name] = {"count": 0, "totalMs": 0.0, "maxMs": 0.0}
+            s["count"] += 1
+            s["totalMs"] += ms
+            s["maxMs"] = max(s["maxMs"], ms)
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self, **attrs) -> Dict[str, Any]:
+        with self._lock:
+            spans = {k: {"count": v["count"], "totalMs": round(v["totalMs"], 2), "maxMs": round(v["maxMs"], 2)}
+                     for k, v in sorted(self.spans.items())}
+            counters = dict(sorted(self.counters.items()))
+        return {
+            "type": "summsync.trace", "trace": self.name, "requestId": self.request_id, **self.attrs, **attrs,
+            "durationMs": round((time.perf_counter() - self.started) * 1000, 2), "spans": spans, "counters": counters,
+        }
+
+def current() -> Optional[Trace]:
+    return _current.get()
+
+def incr(name: str, value: float = 1):
+    # Counter on the active request, a no-op outside of one
+    t = _current.get()
+    if t is not None and value:
+        t.incr(name, value)
+
+def record(name: str, ms: float):
+    # Span measured by the caller (e.g. across a generator's yields), a no-op outside of a request
+    t = _current.get()
+    if t is not None:
+        t.add_span(name, ms)
+
+@contextlib.contextmanager
+def span(name: str) -> Iterator[None]:
+    t = _current.get()
+    if t is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        t.add_span(name, (time.perf_counter() - start) * 1000)
+
+@contextlib.contextmanager
+def request_trace(name: str, request_id: Optional[str] = None, **attrs) -> Iterator[Trace]:
+    '''
+        request_trace -> Activates a Trace for the block and emits its summary when the block ends
+        Set trace.attrs (e.g. "status") inside the block to add fields to the summary
+    '''
+    t = Trace(name, request_id, **attrs)
+    token = _current.set(t)
+    try:
+        yield t
+    except Exception as e:
+        t.attrs.setdefault("error", type(e).__name__)
+        raise
+    finally:
+        _current.reset(token)
+        emit(t.summary())
+
+def bind(fn: Callable) -> Callable:
+    # Carries the caller's trace into a pool thread (executors do not copy contextvars), one context copy per call
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.copy().run(fn, *args, **kwargs)
+
+def emit(summary: Dict[str, Any]):
+    if TRACE_FORMAT == "off":
+        return
+    if TRACE_FORMAT == "emf":
+        summary = _emf(summary)
+    print(json.dumps(summary, default=str)) # One line per request, CloudWatch parses it as JSON
+
+def _emf(summary: Dict[str, Any]) -> Dict[str, Any]:
+    # Counters and the request duration become metrics, span timings stay plain (queryable) fields
+    # The only dimension is the trace name, a route key (main.route_key), so the metric count stays bounded
+    metrics = [{"Name": "durationMs", "Unit": "Milliseconds"}]
+    out = dict(summary)
+    for name, value in summary["counters"].items():
+        metrics.append({"Name": name, "Unit": "Count"})
+        out[name] = value
+    out["_aws"] = {
+        "Timestamp": int(time.time() * 1000),
+        "CloudWatchMetrics": [{"Namespace": TRACE_NAMESPACE, "Dimensions": [["trace"]], "Metrics": metrics[:100]}],
+    }
+    return out
@@ -1,152 +1,107 @@
 import os
-import json
-import urllib.request
 from urllib.parse import quote
-import json, os, pathlib
-from importlib.resources import files as ir_files
+from core.concurrency import imap_concurrent, MATCH_FETCH_WORKERS
+from core.cache import LayeredCache
+from core.matches import compact_match
+from core.riot import riot, RiotAPIError, AMERICAS, NA1
+from core.keys import riot_id_key
+from store.match_cache import get_cached_match, put_cached_match
+from store.lookups import get_lookup, put_lookup
 
-_CHAMPIONS = None
+PUUID_CACHE_TTL_SECS = int(os.environ.get("PUUID_CACHE_TTL_SECS", str(24 * 3600))) # Riot ID -> PUUID almost never changes
+RANK_CACHE_TTL_SECS  = int(os.environ.get("RANK_CACHE_TTL_SECS", "300"))          # League entries move with every ranked game
 
-def _load_champions():
-    errors = []
-
-    # 1) Load from package data: summsync/data/champion.json
-    try:
-        with ir_files("summsync.data").joinpath("champion.json").open("r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        errors.append(f"package summsync.data: {e}")
-
-    here = pathlib.Path(__file__).resolve()
-    candidates = [
-        here.parent / "data" / "champion.json",          # same dir has /data
-        here.parent.parent / "data" / "champion.json",   # one level up has /data
-        pathlib.Path("/var/task/data/champion.json"),    # Lambda code root
-        pathlib.Path("/opt/data/champion.json"),         # Lambda Layer path
-    ]
-    for p in candidates:
-        try:
-            if p.exists():
-                return json.loads(p.read_text(encoding="utf-8"))
-        except Exception as e:
-            errors.append(f"{p}: {e}")
-
-    raise FileNotFoundError("champion.json not found. Tried:\n" + "\n".join(f"- {x}" for x in errors))
+# In-process LRU first, then the shared lookup table, then Riot
+_ACCOUNTS = LayeredCache("account", 1024, PUUID_CACHE_TTL_SECS,
+                         load=lambda key: get_lookup(f"account#{key}"),
+                         save=lambda key, puuid: put_lookup(f"account#{key}", puuid, PUUID_CACHE_TTL_SECS))
+_RANKS = LayeredCache("league", 1024, RANK_CACHE_TTL_SECS,
+                      load=lambda puuid: get_lookup(f"league#{puuid}"),
+                      save=lambda puuid, entries: put_lookup(f"league#{puuid}", entries, RANK_CACHE_TTL_SECS))
 
 def get_puuid(name, gameTag):
+    # None when no account matches the Riot ID (not cached, the name may be claimed later)
+    return _ACCOUNTS.get(riot_id_key(name, gameTag), lambda: _fetch_puuid(name, gameTag))
+
+def _fetch_puuid(name, gameTag):
     name_enc = quote(str(name), safe='')
     tag_enc = quote(str(gameTag), safe='')
-    url = f"https://americas.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{name_enc}/{str(tag_enc)}?api_key={os.environ.get("RIOT_API_KEY")}"
 
     try:
-        with urllib.request.urlopen(url) as response:
-            data = json.loads(response.read().decode())
-            '''
-            RESPONSE:
-            {
-                "puuid": {puuid},
-                "gameName": "Crolwick",
-                "tagLine": "LION"
-            }
-            '''
+        data = riot.get(AMERICAS, f"/riot/account/v1/accounts/by-riot-id/{name_enc}/{tag_enc}", method="account-v1.by-riot-id")
+    except RiotAPIError as e:
+        if e.status == 404: # No account with this Riot ID
+            return None
+        raise
+    '''
+    RESPONSE:
+    {
+        "puuid": {puuid},
+        "gameName": "Crolwick",
+        "tagLine": "LION"
+    }
+    '''
 
-            if "puuid" not in data.keys():
-                raise KeyError(f"The key puuid does not exist. Please check the API documentation to ensure format is still correct, else you gave the wrong URL.")
+    if "puuid" not in data.keys():
+        raise KeyError(f"The key puuid does not exist. Please check the API documentation to ensure format is still correct, else you gave the wrong URL.")
 
-            print('Status Code: 200')
-        return  data['puuid']
-    except Exception as e:
-        print(f"Error making API call: {e}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps(f"Error: {str(e)}")
-        }
+    return data['puuid']
     
-def get_champion_name(champ_id: int):
-    # Match The champ_id parameter to it's corresponding champion name in the champions json
-    global _CHAMPIONS
-    if _CHAMPIONS is None:
-        _CHAMPIONS = _load_champions()['data']
-
-    for key, value in _CHAMPIONS.items():
-        if int(value['key']) == int(champ_id):
-            return _CHAMPIONS[key]
-        
 def get_match(match_id):
-    url = f"https://americas.api.riotgames.com/lol/match/v5/matches/{match_id}?api_key={os.environ.get("RIOT_API_KEY")}"
+    # Finished matches never change, so check the match cache before calling Riot
+    cached = get_cached_match(match_id)
+    if cached is not None:
+        return cached
 
-    try:
-        with urllib.request.urlopen(url) as response:
-            data = json.loads(response.read().decode())
-        
-        '''
-        
-        '''
-        return data
-    except Exception as e:
-        print(f"Error making API call: {e}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps(f"Error: {str(e)}")
-        }
-    
-def find_player(participants, name, gameTag):
-    for participant in participants:
-        if participant['riotIdGameName'].lower() == name.lower() and participant['riotIdTagline'].lower() == gameTag.lower():
-            return participant
-        
-    raise LookupError(f"Unable to find the player in list of participants. Please provide correct participant information")
+    # Only the fields the stats pipeline reads are kept (and cached), the full payload is dropped right away
+    data = compact_match(riot.get(AMERICAS, f"/lol/match/v5/matches/{quote(str(match_id), safe='')}", method="match-v5.match"))
+    put_cached_match(match_id, data)
+    return data
 
+def iter_matches(match_ids, max_workers=None):
+    # Fetches match details concurrently: yields (match_id, match) in order with a bounded number of matches held at once
+    return imap_concurrent(lambda match_id: (match_id, get_match(match_id)), match_ids, max_workers or MATCH_FETCH_WORKERS)
+    
 def get_player_rank(puuid):
-    url = f"https://na1.api.riotgames.com/lol/league/v4/entries/by-puuid/{puuid}?api_key={os.environ.get("RIOT_API_KEY")}"
+    # Unranked players come back as an empty list
+    return _RANKS.get(puuid, lambda: _fetch_player_rank(puuid))
 
-    try:
-        with urllib.request.urlopen(url) as response:
-            data = json.loads(response.read().decode())
-            '''
-            RESPONSE:
-            [
-                {
-                    "leagueId": "XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
-                    "summonerId": "Crolwick",
-                    "summonerName": "Crolwick",
-                    "queueType": "RANKED_SOLO_5x5",
-                    "tier": "GOLD",
-                    "rank": "II",
-                    "leaguePoints": 0,
-                    "wins": 0,
-                    "losses": 0,
-                    "hotStreak": false,
-                    "veteran": false,
-                    "freshBlood": false,
-                    "inactive": false
-                },
-                {
-                    "leagueId": "XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
-                    "summonerId": "Crolwick",
-                    "summonerName": "Crolwick",
-                    "queueType": "RANKED_FLEX_SR",
-                    "tier": "SILVER",
-                    "rank": "II",
-                    "leaguePoints": 0,
-                    "wins": 0,
-                    "losses": 0,
-                    "hotStreak": false,
-                    "veteran": false,
-                    "freshBlood": false,
-                    "inactive": false
-                }
-            ]
-            '''
-
-            if len(data) == 0:
-                raise LookupError(f"The player has no ranked data. Please check the API documentation to ensure format is still correct, else you gave the wrong URL.")
+def _fetch_player_rank(puuid):
+    data = riot.get(NA1, f"/lol/league/v4/entries/by-puuid/{puuid}", method="league-v4.by-puuid")
+    '''
+    RESPONSE:
+    [
+        {
+            "leagueId": "XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            "summonerId": "Crolwick",
+            "summonerName": "Crolwick",
+            "queueType": "RANKED_SOLO_5x5",
+            "tier": "GOLD",
+            "rank": "II",
+            "leaguePoints": 0,
+            "wins": 0,
+            "losses": 0,
+            "hotStreak": false,
+            "veteran": false,
+            "freshBlood": false,
+            "inactive": false
+        },
+        {
+            "leagueId": "XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+            "summonerId": "Crolwick",
+            "summonerName": "Crolwick",
+            "queueType": "RANKED_FLEX_SR",
+            "tier": "SILVER",
+            "rank": "II",
+            "leaguePoints": 0,
+            "wins": 0,
+            "losses": 0,
+            "hotStreak": false,
+            "veteran": false,
+            "freshBlood": false,
+            "inactive": false
+        }
+    ]
+    '''
 
-            print('Status Code: 200')
-        return data
-    except Exception as e:
-        print(f"Error making API call: {e}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps(f"Error: {str(e)}")
-        }
\ No newline at end of file
+    return data or []
@@ -1,10 +1,7 @@
 # summsync/main.py
-import json
-from typing import Any, Dict
-from api.create import ep_create
-from api.stats import ep_stats
-from api.mastery import ep_mastery
-from api.ai import ep_ai_insight
+import json, importlib
+from typing import Any, Callable, Dict
+from core import trace
 
 def _cors():
     return {
@@ -63,28 +60,73 @@ def ep_echo(event):
         "resource": event.get("resource"),
     })
 
+# Endpoints are "module:function" and imported on first use, so a cold start only loads the modules its route needs
+# (e.g. /summsync/player/stats never imports the Riot/Bedrock code paths)
+ROUTES = {
+    # debug + test
+    ("GET",  "/"):                 "main:ep_test",
+    ("GET",  "/summsync/test"):    "main:ep_test",
+    ("POST", "/summsync/test"):    "main:ep_test",   # optional
+    ("GET",  "/summsync/_echo"):   "main:ep_echo",
+    ("POST", "/summsync/_echo"):   "main:ep_echo",
+
+    # your real routes
+    ("POST", "/summsync/player/create"):   "api.create:ep_create",
+    ("POST", "/summsync/player/create/status"): "api.create:ep_create_status",
+    ("POST", "/summsync/player/stats"):    "api.stats:ep_stats",
+    ("POST", "/summsync/player/mastery"):  "api.mastery:ep_mastery",
+    ("POST", "/summsync/session"):         "api.session:ep_session",
+    ("POST", "/summsync/party"):           "api.party:ep_party",
+    ("POST", "/summsync/ai-insight"):      "api.ai:ep_ai_insight",
+    ("POST", "/summsync/ai-insight/batch"): "api.ai:ep_ai_insight_batch",
+}
+
+# Routes whose body is an iterator of chunks, only served by the response-streaming front (stream.py)
+# API Gateway buffers every response, so they are not part of ROUTES
+STREAM_ROUTES = {
+    ("POST", "/summsync/ai-insight/stream"): "api.ai:ep_ai_insight_stream",
+}
+
+_loaded: Dict[str, Callable] = {}
+
+def _load(spec: str) -> Callable:
+    fn = _loaded.get(spec)
+    if fn is None:
+        module, _, name = spec.partition(":")
+        mod = globals() if module == "main" else vars(importlib.import_module(module)) # "main" is this module
+        fn = _loaded[spec] = mod[name]
+    return fn
+
+def _endpoint(method: str, path: str):
+    spec = ROUTES.get((method, path))
+    return _load(spec) if spec else None
+
+def route_key(method: str, path: str) -> str: # Bounded name of a request: its ROUTES/STREAM_ROUTES entry, else a constant
+    if method == "OPTIONS":
+        return "OPTIONS"
+    if (method, path) in ROUTES or (method, path) in STREAM_ROUTES:
+        return f"{method} {path}"
+    return "NO_ROUTE"
+
 def handler(event: Dict[str, Any], context):
+    # Every invocation logs one trace summary (spans, Riot/cache/Dynamo/Bedrock counters), see core/trace.py
+    request_id = getattr(context, "aws_request_id", None)
+    if event.get("Records"):
+        with trace.request_trace("sqs", request_id, records=len(event["Records"])):
+            return _load("api.create:handle_create_queue")(event) # SQS deliveries of async create jobs share this function
+
     method, path = _extract_method_path(event)
+    # Named after the matched route, never the raw path: the name is the EMF dimension, and clients choose the path
+    with trace.request_trace(route_key(method, path), request_id, path=path) as t:
+        resp = _route(method, path, event)
+        t.attrs["status"] = resp.get("statusCode")
+        return resp
 
+def _route(method: str, path: str, event: Dict[str, Any]):
     if method == "OPTIONS":
         return _ok("", 200)
 
-    routes = {
-        # debug + test
-        ("GET",  "/"):                 ep_test,
-        ("GET",  "/summsync/test"):    ep_test,
-        ("POST", "/summsync/test"):    ep_test,   # optional
-        ("GET",  "/summsync/_echo"):   ep_echo,
-        ("POST", "/summsync/_echo"):   ep_echo,
-
-        # your real routes
-        ("POST", "/summsync/player/create"):   ep_create,
-        ("POST", "/summsync/player/stats"):    ep_stats,
-        ("POST", "/summsync/player/mastery"):  ep_mastery,
-        ("POST", "/summsync/ai-insight"):      ep_ai_insight,
-    }
-
-    fn = routes.get((method, path))
+    fn = _endpoint(method, path)
     if not fn:
         # Helpful 404 payload to see what we actually received
         return _ok({"error": "NO_ROUTE", "saw": {"method": method, "path": path}}, 404)
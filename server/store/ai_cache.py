@@ -0,0 +1,56 @@
+# summsync/store/ai_cache.py
+import os, json, time, hashlib, logging
+from typing import Any, Dict, List, Optional
+from core.cache import LRUCache
+from store.dynamo import dynamo_client
+
+logger = logging.getLogger(__name__)
+AI_CACHE_TABLE    = os.environ.get("AI_CACHE_TABLE", "SummsyncInsights") # "" keeps the cache in-process only
+AI_CACHE_TTL_SECS = int(os.environ.get("AI_CACHE_TTL_SECS", "3600"))
+AI_CACHE_SIZE     = int(os.environ.get("AI_CACHE_SIZE", "256"))
+
+_memory = LRUCache(AI_CACHE_SIZE, ttl=AI_CACHE_TTL_SECS)
+
+def insight_key(model_id: str, system_msgs: List[Dict[str, Any]], prompt: str, inference_config: Dict[str, Any]) -> str:
+    # Fingerprint of everything that shapes the answer, session context included (it lives in system_msgs)
+    blob = json.dumps({"modelId": model_id, "system": system_msgs, "prompt": prompt, "inferenceConfig": inference_config},
+                      sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def get_cached_insight(key: str) -> Optional[Dict[str, Any]]:
+    '''
+        get_cached_insight -> Cached insight for this fingerprint from the in-process LRU, then DynamoDB, else None
+        DynamoDB TTL deletes lazily, so expiresAt is also checked on read
+    '''
+    hit = _memory.get(key)
+    if hit is not None or not AI_CACHE_TABLE:
+        return hit
+
+    try:
+        r = dynamo_client().get_item(TableName=AI_CACHE_TABLE, Key={"cacheKey": {"S": key}})
+    except Exception as e:
+        logger.warning("Insight cache read failed: %s", e)
+        return None
+    it = r.get("Item")
+    if not it or int(it["expiresAt"]["N"]) <= time.time():
+        return None
+
+    hit = json.loads(it["value"]["S"])
+    _memory.put(key, hit)
+    return hit
+
+def put_cached_insight(key: str, value: Dict[str, Any]):
+    _memory.put(key, value)
+    if not AI_CACHE_TABLE:
+        return
+    try:
+        dynamo_client().put_item(
+            TableName=AI_CACHE_TABLE,
+            Item={
+                "cacheKey": {"S": key},
+                "value": {"S": json.dumps(value)},
+                "expiresAt": {"N": str(int(time.time()) + AI_CACHE_TTL_SECS)},  # enable TTL on this attribute
+            },
+        )
+    except Exception as e:
+        logger.warning("Insight cache write failed: %s", e)
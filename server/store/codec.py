@@ -0,0 +1,52 @@
+# summsync/store/codec.py
+import os, json, zlib
+from typing import Any, Dict
+
+try: # Optional, falls back to compressed JSON when the layer does not ship msgpack
+    import msgpack
+except ImportError:
+    msgpack = None
+
+SESSION_CODEC    = os.environ.get("SESSION_CODEC", "msgpack").lower() # msgpack | json-zlib | json (legacy string attribute)
+COMPRESS_MIN_LEN = 256 # Smaller payloads rarely shrink under zlib
+
+# First byte of every Binary value says how the rest was written
+_MSGPACK, _MSGPACK_ZLIB, _JSON_ZLIB = 1, 2, 3
+
+def _pack_json(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+def encode_value(obj: Any, codec: str = SESSION_CODEC) -> Dict[str, Any]:
+    '''
+        encode_value -> Encodes a payload into a DynamoDB attribute value
+        "json" writes the legacy {"S": json} string, the others write a tagged {"B": bytes} value
+    '''
+    if codec == "json":
+        return {"S": json.dumps(obj)}
+
+    if codec == "msgpack" and msgpack is not None:
+        raw = msgpack.packb(obj, use_bin_type=True)
+        if len(raw) >= COMPRESS_MIN_LEN:
+            packed = zlib.compress(raw)
+            if len(packed) < len(raw):
+                return {"B": bytes([_MSGPACK_ZLIB]) + packed}
+        return {"B": bytes([_MSGPACK]) + raw}
+
+    return {"B": bytes([_JSON_ZLIB]) + zlib.compress(_pack_json(obj))}
+
+def decode_value(attr: Dict[str, Any]) -> Any:
+    # Reads both the legacy JSON string attributes and the tagged binary ones
+    if "S" in attr:
+        return json.loads(attr["S"])
+
+    raw = bytes(attr["B"])
+    tag, body = raw[0], raw[1:]
+    if tag == _JSON_ZLIB:
+        return json.loads(zlib.decompress(body).decode("utf-8"))
+    if msgpack is None:
+        raise RuntimeError("msgpack is required to decode this session item")
+    if tag == _MSGPACK_ZLIB:
+        body = zlib.decompress(body)
+    elif tag != _MSGPACK:
+        raise ValueError(f"Unknown session codec tag {tag}")
+    return msgpack.unpackb(body, raw=False)
@@ -0,0 +1,20 @@
+# summsync/store/dynamo.py
+import os, threading
+from core.concurrency import MATCH_FETCH_WORKERS, PLAYER_FETCH_WORKERS
+
+# Match-cache reads/writes run on every match-fetch thread of every player thread at once, botocore's default pool is 10
+DYNAMO_MAX_POOL = int(os.environ.get("DYNAMO_MAX_POOL", str(PLAYER_FETCH_WORKERS * MATCH_FETCH_WORKERS + PLAYER_FETCH_WORKERS)))
+
+_dynamo = None
+_lock = threading.Lock()
+
+def dynamo_client():
+    # One DynamoDB client (and connection pool) for every store, created on first use so routes that never touch a table skip boto3
+    global _dynamo
+    if _dynamo is None:
+        with _lock: # Player threads can reach a store at the same time on a cold start
+            if _dynamo is None:
+                import boto3
+                from botocore.config import Config
+                _dynamo = boto3.client("dynamodb", config=Config(max_pool_connections=DYNAMO_MAX_POOL))
+    return _dynamo
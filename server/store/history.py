@@ -0,0 +1,37 @@
+# summsync/store/history.py
+import os, json, time, datetime, logging
+from typing import Any, Dict, Optional
+from store.dynamo import dynamo_client
+
+logger = logging.getLogger(__name__)
+HISTORY_TABLE     = os.environ.get("HISTORY_TABLE", "SummsyncHistory")
+HISTORY_TTL_SECS  = int(os.environ.get("HISTORY_TTL_SECS", str(30 * 24 * 3600))) # Players idle this long start over from a full fetch
+
+def get_history_state(puuid: str) -> Optional[Dict[str, Any]]:
+    '''
+        get_history_state -> Aggregated match state stored for this PUUID by the last search, or None
+        Read failures are logged and treated as "no state", which falls back to a full fetch
+    '''
+    try:
+        r = dynamo_client().get_item(TableName=HISTORY_TABLE, Key={"puuid": {"S": puuid}})
+    except Exception as e:
+        logger.warning("History read failed for %s: %s", puuid, e)
+        return None
+    it = r.get("Item")
+    if not it:
+        return None
+    return json.loads(it["state"]["S"])
+
+def put_history_state(puuid: str, state: Dict[str, Any]):
+    try:
+        dynamo_client().put_item(
+            TableName=HISTORY_TABLE,
+            Item={
+                "puuid": {"S": puuid},
+                "state": {"S": json.dumps(state)},
+                "updatedAt": {"S": datetime.datetime.now(datetime.timezone.utc).isoformat()},
+                "expiresAt": {"N": str(int(time.time()) + HISTORY_TTL_SECS)},  # enable TTL on this attribute
+            },
+        )
+    except Exception as e:
+        logger.warning("History write failed for %s: %s", puuid, e)
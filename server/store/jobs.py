@@ -0,0 +1,88 @@
+# summsync/store/jobs.py
+import os, json, time, datetime, logging
+from typing import Any, Dict, List, Optional
+from store.dynamo import dynamo_client
+
+logger = logging.getLogger(__name__)
+JOBS_TABLE    = os.environ.get("JOBS_TABLE", "SummsyncJobs")
+JOB_TTL_SECS  = int(os.environ.get("JOB_TTL_SECS", os.environ.get("SESSION_TTL_SECS", "3600")))
+JOB_STALE_SECS = int(os.environ.get("JOB_STALE_SECS", "900")) # An unfinished job idle this long is presumed dead (Lambda's max run time)
+
+def _now_iso(offset_secs: float = 0):
+    return (datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=offset_secs)).isoformat()
+
+def create_job(job_id: str, players: List[Dict[str, Any]], options: Dict[str, Any]) -> bool:
+    '''
+        create_job -> Stores a pending create job, one progress entry per requested player
+        Returns False (nothing written) while another job with this id is still pending/running and not stale
+        players: list -> {playerName, gameTag} records, in request order
+        options: dict -> create options the worker needs (masteryCount, matchCount, forceRefresh)
+    '''
+    try:
+        _put_job(job_id, players, options)
+        return True
+    except Exception as e: # botocore ClientError, matched by code so botocore is not imported up front
+        if getattr(e, "response", {}).get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+            return False
+        raise
+
+def _put_job(job_id: str, players: List[Dict[str, Any]], options: Dict[str, Any]):
+    dynamo_client().put_item(
+        TableName=JOBS_TABLE,
+        Item={
+            "jobId": {"S": job_id},
+            "status": {"S": "pending"},
+            "options": {"S": json.dumps(options)},
+            "players": {"L": [{"M": {
+                "playerName": {"S": str(p.get("playerName") or "")},
+                "gameTag": {"S": str(p.get("gameTag") or "")},
+                "status": {"S": "pending"},
+            }} for p in players]},
+            "updatedAt": {"S": _now_iso()},
+            "expiresAt": {"N": str(int(time.time()) + JOB_TTL_SECS)},  # enable TTL on this attribute
+        },
+        # ISO timestamps in UTC compare correctly as strings
+        ConditionExpression="attribute_not_exists(jobId) OR #s IN (:done, :error) OR #u < :stale",
+        ExpressionAttributeNames={"#s": "status", "#u": "updatedAt"},
+        ExpressionAttributeValues={":done": {"S": "done"}, ":error": {"S": "error"}, ":stale": {"S": _now_iso(-JOB_STALE_SECS)}},
+    )
+
+def update_job_player(job_id: str, index: int, status: str, error: Optional[Dict[str, Any]] = None):
+    # Updates one list entry in place, so concurrent workers never overwrite each other's progress
+    expr = f"SET #p[{int(index)}].#s = :s, #u = :u"
+    values = {":s": {"S": status}, ":u": {"S": _now_iso()}}
+    names = {"#p": "players", "#s": "status", "#u": "updatedAt"}
+    if error is not None:
+        expr += f", #p[{int(index)}].#e = :e"
+        values[":e"] = {"S": json.dumps(error)}
+        names["#e"] = "error"
+    dynamo_client().update_item(TableName=JOBS_TABLE, Key={"jobId": {"S": job_id}},
+                                 UpdateExpression=expr, ExpressionAttributeNames=names, ExpressionAttributeValues=values)
+
+def set_job_status(job_id: str, status: str):
+    dynamo_client().update_item(
+        TableName=JOBS_TABLE, Key={"jobId": {"S": job_id}},
+        UpdateExpression="SET #s = :s, #u = :u",
+        ExpressionAttributeNames={"#s": "status", "#u": "updatedAt"},
+        ExpressionAttributeValues={":s": {"S": status}, ":u": {"S": _now_iso()}},
+    )
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    r = dynamo_client().get_item(TableName=JOBS_TABLE, Key={"jobId": {"S": job_id}}, ConsistentRead=True)
+    it = r.get("Item")
+    if not it:
+        return None
+    players = []
+    for i, entry in enumerate(it["players"]["L"]):
+        m = entry["M"]
+        rec = {"index": i, "playerName": m["playerName"]["S"], "gameTag": m["gameTag"]["S"], "status": m["status"]["S"]}
+        if "error" in m:
+            rec["error"] = json.loads(m["error"]["S"])
+        players.append(rec)
+    return {
+        "jobId": it["jobId"]["S"],
+        "status": it["status"]["S"],
+        "options": json.loads(it["options"]["S"]),
+        "players": players,
+        "updatedAt": it["updatedAt"]["S"],
+    }
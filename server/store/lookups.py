@@ -0,0 +1,39 @@
+# summsync/store/lookups.py
+import os, json, time, logging
+from typing import Any, Optional
+from store.dynamo import dynamo_client
+
+logger = logging.getLogger(__name__)
+LOOKUP_TABLE = os.environ.get("LOOKUP_TABLE", "SummsyncLookups") # Riot lookups shared by every instance, "" keeps them in-process only
+
+def get_lookup(key: str) -> Optional[Any]:
+    '''
+        get_lookup -> Cached Riot lookup (account, league entries, ...) stored under this key, else None
+        DynamoDB TTL deletes lazily, so expiresAt is also checked on read, read failures count as misses
+    '''
+    if not LOOKUP_TABLE:
+        return None
+    try:
+        r = dynamo_client().get_item(TableName=LOOKUP_TABLE, Key={"lookupKey": {"S": key}})
+    except Exception as e:
+        logger.warning("Lookup read failed for %s: %s", key, e)
+        return None
+    it = r.get("Item")
+    if not it or int(it["expiresAt"]["N"]) <= time.time():
+        return None
+    return json.loads(it["value"]["S"])
+
+def put_lookup(key: str, value: Any, ttl_secs: int):
+    if not LOOKUP_TABLE:
+        return
+    try:
+        dynamo_client().put_item(
+            TableName=LOOKUP_TABLE,
+            Item={
+                "lookupKey": {"S": key},
+                "value": {"S": json.dumps(value)},
+                "expiresAt": {"N": str(int(time.time()) + int(ttl_secs))},  # enable TTL on this attribute
+            },
+        )
+    except Exception as e:
+        logger.warning("Lookup write failed for %s: %s", key, e)
@@ -0,0 +1,93 @@
+# summsync/store/match_cache.py
+import os, json, time, zlib, sqlite3, logging, threading
+from typing import Any, Dict, Optional
+from core.cache import LRUCache
+from core import trace
+from store.dynamo import dynamo_client
+
+logger = logging.getLogger(__name__)
+MATCH_CACHE_BACKEND  = os.environ.get("MATCH_CACHE_BACKEND", "dynamo").lower() # dynamo | sqlite | memory
+MATCH_TABLE          = os.environ.get("MATCH_TABLE", "SummsyncMatches")
+MATCH_CACHE_DB       = os.environ.get("MATCH_CACHE_DB", "/tmp/summsync-matches.sqlite3")
+MATCH_CACHE_SIZE     = int(os.environ.get("MATCH_CACHE_SIZE", "256"))
+MATCH_CACHE_TTL_SECS = int(os.environ.get("MATCH_CACHE_TTL_SECS", str(30 * 24 * 3600))) # Matches never change, TTL only bounds table size
+
+_memory = LRUCache(MATCH_CACHE_SIZE)
+_sqlite = None
+_sqlite_lock = threading.Lock()
+
+def _encode(data: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+def _decode(raw: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(raw).decode("utf-8"))
+
+def _sqlite_conn():
+    global _sqlite
+    if _sqlite is None:
+        _sqlite = sqlite3.connect(MATCH_CACHE_DB, check_same_thread=False)
+        _sqlite.execute("CREATE TABLE IF NOT EXISTS matches (match_id TEXT PRIMARY KEY, body BLOB NOT NULL)")
+        _sqlite.commit()
+    return _sqlite
+
+def _load(match_id: str) -> Optional[bytes]: # Reads the compressed body from the persistent backend
+    if MATCH_CACHE_BACKEND == "dynamo":
+        r = dynamo_client().get_item(TableName=MATCH_TABLE, Key={"matchId": {"S": match_id}})
+        it = r.get("Item")
+        return it["body"]["B"] if it else None
+    if MATCH_CACHE_BACKEND == "sqlite":
+        with _sqlite_lock:
+            row = _sqlite_conn().execute("SELECT body FROM matches WHERE match_id = ?", (match_id,)).fetchone()
+        return row[0] if row else None
+    return None
+
+def _store(match_id: str, raw: bytes) -> None: # Writes the compressed body to the persistent backend
+    if MATCH_CACHE_BACKEND == "dynamo":
+        dynamo_client().put_item(
+            TableName=MATCH_TABLE,
+            Item={
+                "matchId": {"S": match_id},
+                "body": {"B": raw},
+                "expiresAt": {"N": str(int(time.time()) + MATCH_CACHE_TTL_SECS)},  # enable TTL on this attribute
+            },
+        )
+    elif MATCH_CACHE_BACKEND == "sqlite":
+        with _sqlite_lock:
+            conn = _sqlite_conn()
+            conn.execute("INSERT OR REPLACE INTO matches (match_id, body) VALUES (?, ?)", (match_id, raw))
+            conn.commit()
+
+def get_cached_match(match_id: str) -> Optional[Dict[str, Any]]:
+    '''
+        get_cached_match -> Returns the match JSON from the in-process LRU, then the persistent backend, else None
+        Backend failures are logged and treated as a miss so Riot stays the fallback
+    '''
+    data = _memory.get(match_id)
+    if data is not None:
+        trace.incr("cache.match.local")
+        return data
+
+    try:
+        raw = _load(match_id)
+    except Exception as e:
+        logger.warning("Match cache read failed for %s: %s", match_id, e)
+        return None
+    if raw is None:
+        trace.incr("cache.match.miss")
+        return None
+
+    trace.incr("cache.match.shared")
+    data = _decode(bytes(raw))
+    _memory.put(match_id, data)
+    return data
+
+def put_cached_match(match_id: str, data: Dict[str, Any]) -> None:
+    # Only finished matches (full match-v5 payloads) are worth caching
+    if not isinstance(data, dict) or "info" not in data:
+        return
+
+    _memory.put(match_id, data)
+    try:
+        _store(match_id, _encode(data))
+    except Exception as e:
+        logger.warning("Match cache write failed for %s: %s", match_id, e)
@@ -0,0 +1,116 @@
+# summsync/store/profiles.py
+import os, time, uuid, logging
+from typing import Any, Dict, Optional
+from store.codec import encode_value, decode_value
+from store.dynamo import dynamo_client
+
+logger = logging.getLogger(__name__)
+PROFILE_TABLE      = os.environ.get("PROFILE_TABLE", "SummsyncProfiles") # "" keeps profiles in-process only
+PROFILE_TTL_SECS   = int(os.environ.get("PROFILE_TTL_SECS", "600"))      # How long a computed profile counts as fresh
+PROFILE_LEASE_SECS = int(os.environ.get("PROFILE_LEASE_SECS", "15"))     # How long other instances wait on one computing a profile (well under API Gateway's 29s)
+PROFILE_POLL_SECS  = 0.5
+
+_owner = uuid.uuid4().hex # Identifies this instance's leases
+
+def profile_key(puuid: str, mastery_count: int, match_count: int) -> str:
+    return f"{puuid}#{int(mastery_count)}#{int(match_count)}"
+
+def _get_item(key: str) -> Optional[Dict[str, Any]]: # Raw profile item (bundle and/or lease), read failures count as misses
+    try:
+        r = dynamo_client().get_item(TableName=PROFILE_TABLE, Key={"profileKey": {"S": key}}, ConsistentRead=True)
+    except Exception as e:
+        logger.warning("Profile read failed for %s: %s", key, e)
+        return None
+    return r.get("Item")
+
+def _fresh_bundle(it: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    # DynamoDB TTL deletes lazily, so freshness is checked on read
+    if not it or "bundle" not in it or int(it["fetchedAt"]["N"]) + PROFILE_TTL_SECS <= time.time():
+        return None
+    return decode_value(it["bundle"])
+
+def get_profile(key: str) -> Optional[Dict[str, Any]]:
+    # Fresh profile bundle (stats, mastery, rank) stored under this key by any session, else None
+    if not PROFILE_TABLE:
+        return None
+    return _fresh_bundle(_get_item(key))
+
+def put_profile(key: str, bundle: Dict[str, Any]):
+    # Replaces the whole item, which also drops the lease taken to compute it
+    if not PROFILE_TABLE:
+        return
+    now = int(time.time())
+    try:
+        dynamo_client().put_item(
+            TableName=PROFILE_TABLE,
+            Item={
+                "profileKey": {"S": key},
+                "bundle": encode_value(bundle),
+                "fetchedAt": {"N": str(now)},
+                "expiresAt": {"N": str(now + PROFILE_TTL_SECS)},  # enable TTL on this attribute
+            },
+        )
+    except Exception as e:
+        logger.warning("Profile write failed for %s: %s", key, e)
+
+def acquire_profile_lease(key: str) -> bool:
+    '''
+        acquire_profile_lease -> Claims the right to compute this profile across instances (conditional write)
+        Returns False when another instance holds an unexpired lease, errors fail open so the caller just computes
+    '''
+    if not PROFILE_TABLE:
+        return True
+    now = int(time.time())
+    try:
+        dynamo_client().update_item(
+            TableName=PROFILE_TABLE,
+            Key={"profileKey": {"S": key}},
+            UpdateExpression="SET #l = :until, #o = :me, #x = :x",
+            ConditionExpression="attribute_not_exists(#l) OR #l < :now",
+            ExpressionAttributeNames={"#l": "leaseUntil", "#o": "leaseOwner", "#x": "expiresAt"},
+            ExpressionAttributeValues={
+                ":until": {"N": str(now + PROFILE_LEASE_SECS)}, ":now": {"N": str(now)},
+                ":me": {"S": _owner}, ":x": {"N": str(now + PROFILE_TTL_SECS)},
+            },
+        )
+        return True
+    except Exception as e:
+        code = getattr(e, "response", {}).get("Error", {}).get("Code")
+        if code == "ConditionalCheckFailedException":
+            return False
+        logger.warning("Profile lease failed for %s: %s", key, e)
+        return True
+
+def release_profile_lease(key: str):
+    # Lets the next request compute right away when ours failed, only if the lease is still ours
+    if not PROFILE_TABLE:
+        return
+    try:
+        dynamo_client().update_item(
+            TableName=PROFILE_TABLE,
+            Key={"profileKey": {"S": key}},
+            UpdateExpression="REMOVE #l, #o",
+            ConditionExpression="#o = :me",
+            ExpressionAttributeNames={"#l": "leaseUntil", "#o": "leaseOwner"},
+            ExpressionAttributeValues={":me": {"S": _owner}},
+        )
+    except Exception as e:
+        logger.debug("Profile lease release skipped for %s: %s", key, e)
+
+def wait_for_profile(key: str, timeout: float = PROFILE_LEASE_SECS) -> Optional[Dict[str, Any]]:
+    '''
+        wait_for_profile -> Polls for the profile another instance is computing
+        None as soon as its lease is released (it failed or found no matches) or expired, or after timeout
+    '''
+    if not PROFILE_TABLE:
+        return None
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(PROFILE_POLL_SECS)
+        it = _get_item(key)
+        hit = _fresh_bundle(it)
+        if hit is not None:
+            return hit
+        if it is None or "leaseUntil" not in it or int(it["leaseUntil"]["N"]) < time.time():
+            return None # Nobody is computing it any more
+    return None
@@ -1,10 +1,21 @@
 # summsync/store/session.py
-import os, json, time, datetime, boto3
+import os, time, random, logging, datetime
+from store.codec import encode_value, decode_value
+from core.keys import riot_id_key
+from core import trace
 from typing import Any, Dict, List, Optional
+from store.dynamo import dynamo_client
 
-dynamo = boto3.client("dynamodb")
 SESS_TABLE        = os.environ.get("SESS_TABLE", "SummsyncSessions")
 SESSION_TTL_SECS  = int(os.environ.get("SESSION_TTL_SECS", "3600"))
+SESS_PLAYER_INDEX = os.environ.get("SESS_PLAYER_INDEX", "") # GSI sessionId (hash) + playerKey (range), e.g. "sessionId-playerKey-index" once the table has it
+BATCH_MAX_RETRIES = int(os.environ.get("BATCH_MAX_RETRIES", "5"))
+
+BATCH_GET_LIMIT   = 100 # Keys per BatchGetItem
+BATCH_WRITE_LIMIT = 25  # Items per BatchWriteItem
+
+logger = logging.getLogger(__name__)
+_index_missing = False # Set after the index was rejected once, so this instance stops asking for it
 
 def _now_iso():
     return datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
@@ -12,64 +23,169 @@ def _now_iso():
 def _expires_at():
     return int(time.time()) + SESSION_TTL_SECS
 
-def _player_key(name: str, tag: str) -> str:
-    return f"{name.strip().upper()}#{tag.strip().upper()}"
+def _consumed(capacity) -> float: # ConsumedCapacity is one dict, or a list of them for batch calls
+    if not capacity:
+        return 0.0
+    if isinstance(capacity, dict):
+        capacity = [capacity]
+    return sum(float(c.get("CapacityUnits") or 0) for c in capacity)
+
+def _dynamo_call(op: str, unit: str, **kwargs) -> Dict[str, Any]:
+    # Every session table call goes through here: timed, with its consumed capacity counted as dynamo.rcu / dynamo.wcu
+    with trace.span(f"dynamo.session.{op}"):
+        r = getattr(dynamo_client(), op)(ReturnConsumedCapacity="TOTAL", **kwargs)
+    trace.incr(f"dynamo.{unit}", _consumed(r.get("ConsumedCapacity")))
+    return r
+
+def _session_item(session_id: str, puuid: str, name: str, tag: str, stats: dict, mastery: list) -> Dict[str, Any]:
+    return {
+        "sessionId": {"S": session_id},
+        "puuid": {"S": puuid},
+        "playerName": {"S": name},
+        "gameTag": {"S": tag},
+        "playerKey": {"S": riot_id_key(name, tag)},
+        "updatedAt": {"S": _now_iso()},
+        "expiresAt": {"N": str(_expires_at())},  # enable TTL on this attribute
+        "stats": encode_value(stats or {}),
+        "mastery": encode_value(mastery or []),
+    }
 
 def put_session_player(session_id: str, puuid: str, name: str, tag: str, stats: dict, mastery: list):
-    dynamo.put_item(
+    _dynamo_call("put_item", "wcu",
         TableName=SESS_TABLE,
-        Item={
-            "sessionId": {"S": session_id},
-            "puuid": {"S": puuid},
-            "playerName": {"S": name},
-            "gameTag": {"S": tag},
-            "playerKey": {"S": _player_key(name, tag)},
-            "updatedAt": {"S": _now_iso()},
-            "expiresAt": {"N": str(_expires_at())},  # enable TTL on this attribute
-            "stats": {"S": json.dumps(stats or {})},
-            "mastery": {"S": json.dumps(mastery or [])},
-        },
+        Item=_session_item(session_id, puuid, name, tag, stats, mastery),
     )
 
-def query_session(session_id: str) -> List[Dict[str, Any]]:
-    r = dynamo.query(
-        TableName=SESS_TABLE,
+SESSION_FIELDS = ("stats", "mastery") # Payload fields a reader can project on
+
+def _item_to_player(it: Dict[str, Any]) -> Dict[str, Any]:
+    out = {
+        "puuid": it["puuid"]["S"],
+        "playerName": it["playerName"]["S"],
+        "gameTag": it["gameTag"]["S"],
+        "updatedAt": it["updatedAt"]["S"],
+    }
+    if "stats" in it:
+        out["stats"] = decode_value(it["stats"])
+    if "mastery" in it:
+        out["mastery"] = decode_value(it["mastery"])
+    return out
+
+def _projection(fields: Optional[List[str]]) -> Dict[str, Any]: # ProjectionExpression kwargs for the identity fields + requested payload fields
+    if fields is None:
+        return {}
+    names = ["puuid", "playerName", "gameTag", "updatedAt"] + [f for f in SESSION_FIELDS if f in fields]
+    return {
+        "ProjectionExpression": ", ".join(f"#f{i}" for i in range(len(names))),
+        "ExpressionAttributeNames": {f"#f{i}": n for i, n in enumerate(names)},
+    }
+
+def _query_all(**kwargs) -> List[Dict[str, Any]]: # Follows LastEvaluatedKey so large sessions are read completely
+    items = []
+    while True:
+        r = _dynamo_call("query", "rcu", TableName=SESS_TABLE, **kwargs)
+        items.extend(r.get("Items", []))
+        if not r.get("LastEvaluatedKey"):
+            return items
+        kwargs["ExclusiveStartKey"] = r["LastEvaluatedKey"]
+
+def query_session(session_id: str, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    '''
+        query_session -> Every player stored in the session
+        fields: list -> Optional subset of SESSION_FIELDS to read, identity fields are always included
+    '''
+    items = _query_all(
         KeyConditionExpression="sessionId = :s",
         ExpressionAttributeValues={":s": {"S": session_id}},
+        **_projection(fields),
     )
-    items = r.get("Items", [])
-    out = []
-    for it in items:
-        out.append({
-            "puuid": it["puuid"]["S"],
-            "playerName": it["playerName"]["S"],
-            "gameTag": it["gameTag"]["S"],
-            "stats": json.loads(it["stats"]["S"]),
-            "mastery": json.loads(it["mastery"]["S"]),
-            "updatedAt": it["updatedAt"]["S"],
-        })
-    return out
+    return [_item_to_player(it) for it in items]
 
 def get_item_by_puuid(session_id: str, puuid: str) -> Optional[Dict[str, Any]]:
-    r = dynamo.get_item(
+    r = _dynamo_call("get_item", "rcu",
         TableName=SESS_TABLE,
         Key={"sessionId": {"S": session_id}, "puuid": {"S": puuid}}
     )
     it = r.get("Item")
     if not it:
         return None
-    return {
-        "puuid": it["puuid"]["S"],
-        "playerName": it["playerName"]["S"],
-        "gameTag": it["gameTag"]["S"],
-        "stats": json.loads(it["stats"]["S"]),
-        "mastery": json.loads(it["mastery"]["S"]),
-        "updatedAt": it["updatedAt"]["S"],
-    }
+    return _item_to_player(it)
+
+def _retry_sleep(attempt: int): # Jittered backoff between passes over unprocessed keys/items
+    time.sleep(random.uniform(0, 0.05 * (2 ** attempt)))
+
+def batch_get_session_players(session_id: str, puuids: List[str], fields: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    '''
+        batch_get_session_players -> Stored players of the session for the given PUUIDs, keyed by PUUID
+        One BatchGetItem per 100 keys, UnprocessedKeys are retried with backoff
+    '''
+    out = {}
+    unique = list(dict.fromkeys(puuids)) # BatchGetItem rejects duplicate keys
+    for start in range(0, len(unique), BATCH_GET_LIMIT):
+        request = {SESS_TABLE: {
+            "Keys": [{"sessionId": {"S": session_id}, "puuid": {"S": pu}} for pu in unique[start:start + BATCH_GET_LIMIT]],
+            **_projection(fields),
+        }}
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            r = _dynamo_call("batch_get_item", "rcu", RequestItems=request)
+            for it in r.get("Responses", {}).get(SESS_TABLE, []):
+                player = _item_to_player(it)
+                out[player["puuid"]] = player
+            request = r.get("UnprocessedKeys") or {}
+            if not request:
+                break
+            _retry_sleep(attempt)
+        else:
+            raise RuntimeError(f"batch_get_session_players: keys still unprocessed after {BATCH_MAX_RETRIES} retries")
+    return out
+
+def batch_put_session_players(session_id: str, players: List[Dict[str, Any]]):
+    '''
+        batch_put_session_players -> Stores many players of the session at once
+        players: list -> {puuid, playerName, gameTag, stats, mastery} records
+        One BatchWriteItem per 25 items, UnprocessedItems are retried with backoff
+    '''
+    by_puuid = {p["puuid"]: p for p in players} # BatchWriteItem rejects two writes to the same key
+    items = [_session_item(session_id, p["puuid"], p["playerName"], p["gameTag"], p.get("stats"), p.get("mastery"))
+             for p in by_puuid.values()]
+    for start in range(0, len(items), BATCH_WRITE_LIMIT):
+        request = {SESS_TABLE: [{"PutRequest": {"Item": it}} for it in items[start:start + BATCH_WRITE_LIMIT]]}
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            r = _dynamo_call("batch_write_item", "wcu", RequestItems=request)
+            request = r.get("UnprocessedItems") or {}
+            if not request:
+                break
+            _retry_sleep(attempt)
+        else:
+            raise RuntimeError(f"batch_put_session_players: items still unprocessed after {BATCH_MAX_RETRIES} retries")
+
+def get_session_player(session_id: str, name: str, tag: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    '''
+        get_session_player -> One player of the session by name#tag, a single keyed query on SESS_PLAYER_INDEX
+        Falls back to reading the session when the index is disabled, missing, or has not caught up with a fresh write
+    '''
+    global _index_missing
+    pkey = riot_id_key(name, tag)
+    if SESS_PLAYER_INDEX and not _index_missing:
+        try:
+            r = _dynamo_call("query", "rcu",
+                TableName=SESS_TABLE,
+                IndexName=SESS_PLAYER_INDEX,
+                KeyConditionExpression="sessionId = :s AND playerKey = :k",
+                ExpressionAttributeValues={":s": {"S": session_id}, ":k": {"S": pkey}},
+                Limit=1,
+                **_projection(fields),
+            )
+            items = r.get("Items", [])
+            if items:
+                return _item_to_player(items[0])
+        except Exception as e: # botocore ClientError, matched by code so botocore is not imported up front
+            if getattr(e, "response", {}).get("Error", {}).get("Code") not in ("ValidationException", "ResourceNotFoundException"):
+                raise
+            _index_missing = True
+            logger.warning("Index %s unavailable on %s, reading the whole session from now on", SESS_PLAYER_INDEX, SESS_TABLE)
 
-def get_session_player(session_id: str, name: str, tag: str) -> Optional[Dict[str, Any]]:
-    pkey = _player_key(name, tag)
-    for it in query_session(session_id):
-        if _player_key(it["playerName"], it["gameTag"]) == pkey:
+    for it in query_session(session_id, fields):
+        if riot_id_key(it["playerName"], it["gameTag"]) == pkey:
             return it
     return None
@@ -0,0 +1,83 @@
+# summsync/stream.py
+'''
+    Response-streaming front for the same code: a small HTTP server run behind AWS Lambda Web Adapter
+    Deployed with a Function URL in InvokeMode RESPONSE_STREAM and AWS_LWA_INVOKE_MODE=response_stream, so the
+    STREAM_ROUTES of main.py reach the client chunk by chunk instead of being buffered like behind API Gateway
+
+    Every other route is handed to main.handler as an HTTP API (v2) event, so the Function URL serves the whole API
+    Run from server/ as the function's command: python -m stream (listens on $PORT, 8080 is the adapter's default)
+'''
+import os, logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+from urllib.parse import urlsplit
+from core import trace
+import main
+
+logger = logging.getLogger(__name__)
+STREAM_HOST = os.environ.get("STREAM_HOST", "127.0.0.1") # The adapter runs next to the server in the same sandbox
+STREAM_PORT = int(os.environ.get("PORT", "8080"))         # Port the adapter forwards to (AWS_LWA_PORT / PORT)
+
+def _event(method: str, url: str, headers: Dict[str, str], body: bytes) -> Dict[str, Any]:
+    # Request as an API Gateway HTTP API (v2) event, the shape main.handler and parse_body read
+    u = urlsplit(url)
+    return {
+        "rawPath": u.path, "rawQueryString": u.query, "headers": headers,
+        "requestContext": {"http": {"method": method, "path": u.path}, "stage": "$default"},
+        "body": body.decode("utf-8"), "isBase64Encoded": False,
+    }
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive with the adapter, chunked transfer encoding for streamed bodies
+
+    def _serve(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        event = _event(self.command, self.path, {k.lower(): v for k, v in self.headers.items()}, body)
+        method, path = main._extract_method_path(event)
+        spec = main.STREAM_ROUTES.get((method, path))
+        if spec is None:
+            self._send(main.handler(event, None)) # Traced by main.handler
+            return
+
+        # The trace stays open until the last chunk is written, so it covers the whole generation
+        with trace.request_trace(main.route_key(method, path), self.headers.get("Lambda-Runtime-Aws-Request-Id"), path=path) as t:
+            resp = main._load(spec)(event)
+            t.attrs["status"] = resp.get("statusCode")
+            self._send(resp)
+
+    def _send(self, resp: Dict[str, Any]):
+        body = resp.get("body")
+        self.send_response(resp.get("statusCode", 200))
+        for k, v in (resp.get("headers") or {}).items():
+            self.send_header(k, v)
+
+        if body is None or isinstance(body, str):
+            raw = (body or "").encode("utf-8")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+            return
+
+        # Iterator body: every chunk is flushed as soon as the endpoint yields it
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in body:
+            data = chunk.encode("utf-8")
+            if data:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    do_GET = do_POST = do_OPTIONS = _serve
+
+    def log_message(self, *args): # Every request already logs its trace summary
+        pass
+
+def serve():
+    server = ThreadingHTTPServer((STREAM_HOST, STREAM_PORT), _Handler)
+    server.daemon_threads = True
+    logger.info("Streaming front listening on %s:%d", STREAM_HOST, STREAM_PORT)
+    server.serve_forever()
+
+if __name__ == "__main__":
+    serve()
@@ -13,43 +13,44 @@ document.addEventListener("DOMContentLoaded", async () => {
 
   const container = document.getElementById("players-container");
 
-  // Fetch player stats and mastery
-  async function fetchPlayerData(player) {
-    const { playerName, gameTag } = player;
-
-    // Fetch stats
-    const statsResp = await fetch(
-      "https://6s6bu9zrxe.execute-api.us-west-1.amazonaws.com/summsync/player/stats",
-      {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ sessionId, playerName, gameTag }),
-      }
-    );
-
-    if (!statsResp.ok) {
-      throw new Error(`Stats API returned ${statsResp.status}`);
+  // Fetch every player's stats and mastery for this session in one request
+  const sessionPlayersPromise = fetch(
+    "https://6s6bu9zrxe.execute-api.us-west-1.amazonaws.com/summsync/session",
+    {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ sessionId }),
+    }
+  ).then(async (resp) => {
+    if (!resp.ok) {
+      throw new Error(`Session API returned ${resp.status}`);
+    }
+    const data = await resp.json();
+    const byKey = {};
+    for (const it of data.players || []) {
+      byKey[playerKey(it.playerName, it.gameTag)] = it;
     }
+    return byKey;
+  });
 
-    const stats = await statsResp.json();
+  // Same normalization the server uses for playerKey
+  function playerKey(playerName, gameTag) {
+    return `${String(playerName).trim().toUpperCase()}#${String(gameTag)
+      .trim()
+      .toUpperCase()}`;
+  }
 
-    // Fetch mastery
-    const masteryResp = await fetch(
-      "https://6s6bu9zrxe.execute-api.us-west-1.amazonaws.com/summsync/player/mastery",
-      {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ sessionId, playerName, gameTag }),
-      }
-    );
+  // Look up a player's stats and mastery in the session response
+  async function fetchPlayerData(player) {
+    const { playerName, gameTag } = player;
+    const sessionPlayers = await sessionPlayersPromise;
+    const it = sessionPlayers[playerKey(playerName, gameTag)];
 
-    if (!masteryResp.ok) {
-      throw new Error(`Mastery API returned ${masteryResp.status}`);
+    if (!it) {
+      throw new Error("Player not found in this session");
     }
 
-    const mastery = await masteryResp.json();
-
-    return { stats, mastery };
+    return { stats: it, mastery: it };
   }
 
   // Fetch AI insight for a player